@@ -0,0 +1,163 @@
+import itertools
+import random
+import sys
+import time
+
+from counting import count_models
+from generator import generate_puzzle
+from inference import entails, resolution
+from logic import *
+from simplify import model_check_simplified, pipeline
+
+# Entailment backends, each called as backend(knowledge, query)
+BACKENDS = {
+    "model_check": model_check,
+    "model_check_parallel": model_check_parallel,
+    "model_check_simplified": model_check_simplified,
+    "resolution": resolution,
+    "entails": entails,
+}
+
+
+def random_3cnf(symbols, clauses, rng=random):
+    """
+    Returns a random 3-CNF knowledge base over `symbols` Symbol objects
+    with `clauses` clauses, each a disjunction of three distinct literals.
+    """
+    atoms = [Symbol(f"P{i}") for i in range(symbols)]
+    knowledge = And()
+    for _ in range(clauses):
+        literals = [
+            atom if rng.random() < 0.5 else Not(atom)
+            for atom in rng.sample(atoms, 3)
+        ]
+        knowledge.add(Or(*literals))
+    return knowledge, atoms
+
+
+def timed(function, *args, **kwargs):
+    """Returns the result of a call along with its wall time in seconds."""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def scaling(sizes, ratio=4.26, seed=0):
+    """
+    Times `model_check` against `model_check_parallel` on random 3-CNF
+    knowledge bases with the given numbers of symbols.
+
+    `ratio` is the clause-to-symbol ratio; the default sits near the
+    satisfiability threshold, where instances are hardest.
+    """
+    rng = random.Random(seed)
+    print(f"{'symbols':>8} {'clauses':>8} {'serial':>10} "
+          f"{'parallel':>10} {'speedup':>8}")
+    for size in sizes:
+        clauses = round(ratio * size)
+        knowledge, atoms = random_3cnf(size, clauses, rng)
+        query = Or(*atoms[:3])
+        serial, serial_time = timed(model_check, knowledge, query)
+        parallel, parallel_time = timed(model_check_parallel, knowledge, query)
+        if serial != parallel:
+            raise Exception(f"backends disagree at {size} symbols")
+        print(f"{size:>8} {clauses:>8} {serial_time:>9.3f}s "
+              f"{parallel_time:>9.3f}s {serial_time / parallel_time:>7.2f}x")
+
+
+def solve(backend, knowledge, symbols):
+    """Returns the set of symbols entailed by knowledge, using `backend`."""
+    return {symbol for symbol in symbols if backend(knowledge, symbol)}
+
+
+def puzzles(sizes, budget=5.0, seed=0):
+    """
+    Times every entailment backend on generated knights and knaves
+    puzzles with the given numbers of characters.
+
+    A backend is dropped once solving a puzzle takes longer than
+    `budget` seconds, and the last size it handled is reported. The
+    last column is the size of each knowledge base after simplifying,
+    as a fraction of its size before.
+    """
+    rng = random.Random(seed)
+    active = dict(BACKENDS)
+    practical = dict()
+    header = " ".join(f"{name:>22}" for name in BACKENDS)
+    print(f"{'characters':>10} {header} {'shrink':>8}")
+    for size in sizes:
+        if not active:
+            break
+        knowledge, symbols, _ = generate_puzzle(size, rng=rng)
+        row = []
+        answers = set()
+        for name in BACKENDS:
+            if name not in active:
+                row.append(f"{'-':>22}")
+                continue
+            answer, elapsed = timed(solve, active[name], knowledge, symbols)
+            answers.add(frozenset(answer))
+            row.append(f"{elapsed:>21.3f}s")
+            if elapsed > budget:
+                del active[name]
+            else:
+                practical[name] = size
+        if len(answers) > 1:
+            raise Exception(f"backends disagree at {size} characters")
+        _, before, after = pipeline(knowledge)
+        print(f"{size:>10} " + " ".join(row) + f" {after / before:>8.2f}")
+
+    print(f"Largest puzzle solved within {budget}s")
+    for name in BACKENDS:
+        print(f"  {name}: {practical.get(name, 'none')}")
+
+
+def enumerate_count(knowledge):
+    """Counts the models of knowledge base by checking every assignment."""
+    symbols = sorted(knowledge.symbols())
+    return sum(
+        knowledge.evaluate(dict(zip(symbols, values)))
+        for values in itertools.product((True, False), repeat=len(symbols))
+    )
+
+
+def counting(sizes, ratio=2.0, budget=5.0, seed=0):
+    """
+    Times `count_models` against exhaustive enumeration on random 3-CNF
+    knowledge bases, dropping enumeration once it exceeds `budget`.
+    """
+    rng = random.Random(seed)
+    enumerate_active = True
+    print(f"{'symbols':>8} {'models':>22} {'enumerate':>10} {'count':>10}")
+    for size in sizes:
+        knowledge, _ = random_3cnf(size, round(ratio * size), rng)
+        count, count_time = timed(count_models, knowledge)
+        column = f"{'-':>10}"
+        if enumerate_active:
+            brute, brute_time = timed(enumerate_count, knowledge)
+            if brute != count:
+                raise Exception(f"counts disagree at {size} symbols")
+            column = f"{brute_time:>9.3f}s"
+            enumerate_active = brute_time <= budget
+        print(f"{size:>8} {count:>22} {column} {count_time:>9.3f}s")
+        if count_time > budget:
+            break
+
+
+def main():
+    modes = ["cnf", "puzzles", "count"]
+    if len(sys.argv) not in [2, 3] or sys.argv[1] not in modes:
+        sys.exit("Usage: python benchmark.py cnf|puzzles|count [max_size]")
+    if sys.argv[1] == "cnf":
+        largest = int(sys.argv[2]) if len(sys.argv) == 3 else 16
+        scaling(range(8, largest + 1, 2))
+    elif sys.argv[1] == "count":
+        largest = int(sys.argv[2]) if len(sys.argv) == 3 else 60
+        counting(range(10, largest + 1, 5))
+    else:
+        largest = int(sys.argv[2]) if len(sys.argv) == 3 else 12
+        puzzles(range(2, largest + 1))
+
+
+if __name__ == "__main__":
+    main()
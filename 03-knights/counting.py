@@ -0,0 +1,167 @@
+import itertools
+
+from inference import clauses
+from logic import *
+
+
+def count_models(knowledge, symbols=None):
+    """
+    Returns the number of models of knowledge base over `symbols`,
+    which defaults to the symbols appearing in the knowledge base.
+
+    Counts by DPLL-style branching: the clauses are split into
+    connected components that share no symbols, each component is
+    counted separately, and component counts are cached so that a
+    component reached through different branches is counted once.
+    """
+    symbols = _symbol_names(knowledge, symbols)
+    kb = clauses(knowledge)
+    names = _names(kb)
+    if not names <= symbols:
+        raise ValueError("knowledge base mentions symbols outside `symbols`")
+    return _count(kb, dict()) * 2 ** len(symbols - names)
+
+
+def _count(kb, cache):
+    """Returns the number of models of `kb` over its own symbols."""
+    names = _names(kb)
+    kb, forced = propagate(kb)
+    if kb is None:
+        return 0
+
+    # Symbols removed without being forced by a unit are unconstrained
+    total = 2 ** (len(names) - len(forced) - len(_names(kb)))
+    for component in components(kb):
+        if component not in cache:
+            cache[component] = _count_component(component, cache)
+        total *= cache[component]
+        if total == 0:
+            break
+    return total
+
+
+def _count_component(kb, cache):
+    """Returns the number of models of a connected set of clauses."""
+    names = _names(kb)
+    name = _branch(kb)
+    total = 0
+    for value in (True, False):
+        reduced = assign(kb, name, value)
+
+        # Symbols that vanished from the clauses are free to take any value
+        free = len(names) - 1 - len(_names(reduced))
+        total += _count(reduced, cache) * 2 ** free
+    return total
+
+
+def models(knowledge, symbols=None):
+    """
+    Yields every model of knowledge base over `symbols`, one at a time,
+    as a dictionary mapping symbol names to truth values.
+
+    Models are produced lazily by backtracking search, so the caller can
+    stop early without the remaining models ever being built.
+    """
+    symbols = _symbol_names(knowledge, symbols)
+    kb = clauses(knowledge)
+    if not _names(kb) <= symbols:
+        raise ValueError("knowledge base mentions symbols outside `symbols`")
+    yield from _models(kb, sorted(symbols), dict())
+
+
+def _models(kb, symbols, model):
+    """Yields every extension of `model` that satisfies `kb`."""
+    if frozenset() in kb:
+        return
+    if not kb:
+        free = [name for name in symbols if name not in model]
+        for values in itertools.product((True, False), repeat=len(free)):
+            extended = model.copy()
+            extended.update(zip(free, values))
+            yield extended
+        return
+    name = _branch(kb)
+    for value in (True, False):
+        model[name] = value
+        yield from _models(assign(kb, name, value), symbols, model)
+        del model[name]
+
+
+def assign(kb, name, value):
+    """Returns the clauses left after setting symbol `name` to `value`."""
+    return frozenset(
+        clause - {(name, not value)}
+        for clause in kb if (name, value) not in clause
+    )
+
+
+def propagate(kb):
+    """
+    Repeatedly assigns the symbols of unit clauses.
+
+    Returns the remaining clauses along with the set of forced symbol
+    names, or (None, None) if propagation reaches a contradiction.
+    """
+    forced = set()
+    while True:
+        if frozenset() in kb:
+            return None, None
+        unit = next((clause for clause in kb if len(clause) == 1), None)
+        if unit is None:
+            return kb, forced
+        name, value = next(iter(unit))
+        forced.add(name)
+        kb = assign(kb, name, value)
+
+
+def components(kb):
+    """
+    Splits a set of clauses into connected components, where two clauses
+    are connected when they share a symbol.
+    """
+    parent = dict()
+
+    def find(name):
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    for clause in kb:
+        roots = set()
+        for name, _ in clause:
+            parent.setdefault(name, name)
+            roots.add(find(name))
+        first = roots.pop()
+        for root in roots:
+            parent[root] = first
+
+    groups = dict()
+    for clause in kb:
+        name, _ = next(iter(clause))
+        groups.setdefault(find(name), set()).add(clause)
+    return [frozenset(group) for group in groups.values()]
+
+
+def _symbol_names(knowledge, symbols):
+    """Returns the names of `symbols`, given as Symbols or strings."""
+    if symbols is None:
+        return knowledge.symbols()
+    return {
+        symbol.name if isinstance(symbol, Symbol) else symbol
+        for symbol in symbols
+    }
+
+
+def _branch(kb):
+    """Chooses the symbol that appears in the most clauses."""
+    occurrences = dict()
+    for clause in kb:
+        for name, _ in clause:
+            occurrences[name] = occurrences.get(name, 0) + 1
+    return max(occurrences, key=occurrences.get)
+
+
+def _names(kb):
+    """Returns the set of symbol names mentioned in a set of clauses."""
+    return {name for clause in kb for name, _ in clause}
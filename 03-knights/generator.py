@@ -0,0 +1,74 @@
+import random
+
+from logic import *
+
+
+def characters(n):
+    """
+    Returns a list of `n` (name, knight, knave) triples, where `knight`
+    and `knave` are the Symbols for that character's two possible roles.
+    """
+    names = [chr(ord("A") + i) if n <= 26 else f"C{i}" for i in range(n)]
+    return [
+        (name, Symbol(f"{name} is a Knight"), Symbol(f"{name} is a Knave"))
+        for name in names
+    ]
+
+
+def random_claim(people, rng=random):
+    """
+    Returns a random claim about `people` as a (text, sentence) pair.
+    """
+    kind = rng.randrange(5)
+    (a, a_knight, a_knave), (b, b_knight, b_knave) = (
+        rng.sample(people, 2) if len(people) > 1 else people * 2
+    )
+    if kind == 0:
+        return f"{a} is a knight.", a_knight
+    if kind == 1:
+        return f"{a} is a knave.", a_knave
+    if kind == 2:
+        return (f"{a} and {b} are the same kind.",
+                Or(And(a_knight, b_knight), And(a_knave, b_knave)))
+    if kind == 3:
+        return (f"{a} and {b} are of different kinds.",
+                Or(And(a_knight, b_knave), And(a_knave, b_knight)))
+    return f"{a} or {b} is a knave.", Or(a_knave, b_knave)
+
+
+def generate_puzzle(n, statements=None, rng=random):
+    """
+    Generates a knights and knaves puzzle with `n` characters.
+
+    A hidden role is drawn for every character, and random claims are
+    kept only if they are true exactly when the speaker is a knight, so
+    the resulting knowledge base is always satisfiable.
+
+    Returns a tuple (knowledge, symbols, lines), where `symbols` lists
+    every role Symbol and `lines` holds the spoken claims as text.
+    """
+    if statements is None:
+        statements = n
+    people = characters(n)
+    knowledge = And()
+    symbols = []
+    roles = dict()
+    for name, knight, knave in people:
+        knowledge.add(Or(knight, knave))
+        knowledge.add(Not(And(knight, knave)))
+        symbols.extend([knight, knave])
+        is_knight = rng.random() < 0.5
+        roles[knight.name] = is_knight
+        roles[knave.name] = not is_knight
+
+    lines = []
+    while len(lines) < statements:
+        speaker, knight, knave = rng.choice(people)
+        text, claim = random_claim(people, rng)
+        if claim.evaluate(roles) != roles[knight.name]:
+            continue
+        knowledge.add(Implication(knight, claim))
+        knowledge.add(Implication(knave, Not(claim)))
+        lines.append(f'{speaker} says "{text}"')
+
+    return knowledge, symbols, lines
@@ -0,0 +1,267 @@
+import functools
+import heapq
+import itertools
+
+from logic import *
+
+# Largest number of symbols for which enumerating every model is
+# considered cheaper than running a clause-based engine
+MODEL_CHECK_SYMBOLS = 6
+
+
+@functools.lru_cache(maxsize=64)
+def clauses(sentence):
+    """
+    Returns the clauses of a sentence in conjunctive normal form.
+
+    Each clause is a frozenset of literals, and each literal is a pair
+    (name, polarity) where polarity is False for a negated symbol.
+    Tautological clauses are dropped; an empty clause means falsehood.
+    """
+    return frozenset(_cnf(sentence, True))
+
+
+def _cnf(sentence, positive):
+    """Returns the clauses of `sentence`, or of its negation."""
+    if isinstance(sentence, Symbol):
+        return {frozenset([(sentence.name, positive)])}
+    if isinstance(sentence, Not):
+        return _cnf(sentence.operand, not positive)
+    if isinstance(sentence, And):
+        parts = [_cnf(conjunct, positive) for conjunct in sentence.conjuncts]
+        return set().union(*parts) if positive else _product(parts)
+    if isinstance(sentence, Or):
+        parts = [_cnf(disjunct, positive) for disjunct in sentence.disjuncts]
+        return _product(parts) if positive else set().union(*parts)
+    if isinstance(sentence, Implication):
+        if positive:
+            return _product([_cnf(sentence.antecedent, False),
+                             _cnf(sentence.consequent, True)])
+        return (_cnf(sentence.antecedent, True)
+                | _cnf(sentence.consequent, False))
+    if isinstance(sentence, Biconditional):
+        left, right = sentence.left, sentence.right
+        return (_product([_cnf(left, not positive), _cnf(right, True)])
+                | _product([_cnf(left, positive), _cnf(right, False)]))
+    raise TypeError(f"cannot convert {sentence} to clauses")
+
+
+def _product(parts):
+    """Distributes a disjunction over several sets of clauses."""
+    result = {frozenset()}
+    for part in parts:
+        result = {
+            clause | other
+            for clause in result for other in part
+            if not tautology(clause | other)
+        }
+    return result
+
+
+def tautology(clause):
+    """Checks whether a clause contains a literal and its negation."""
+    return any((name, not polarity) in clause for name, polarity in clause)
+
+
+def horn(clause):
+    """Checks whether a clause has at most one positive literal."""
+    return sum(polarity for _, polarity in clause) <= 1
+
+
+def forward_chain(kb):
+    """
+    Returns the set of symbol names entailed by a set of Horn clauses,
+    or None if the clauses are inconsistent.
+
+    Runs in time linear in the total size of the clauses: each clause
+    keeps a count of premises not yet inferred, and a symbol is put on
+    the agenda when the count of a clause concluding it reaches zero.
+    """
+    count = dict()
+    conclusion = dict()
+    premise_of = dict()
+    agenda = []
+    for i, clause in enumerate(kb):
+        premises = [name for name, polarity in clause if not polarity]
+        head = [name for name, polarity in clause if polarity]
+        count[i] = len(premises)
+        conclusion[i] = head[0] if head else None
+        for name in premises:
+            premise_of.setdefault(name, []).append(i)
+        if not premises:
+            agenda.append(conclusion[i])
+
+    inferred = set()
+    while agenda:
+        p = agenda.pop()
+
+        # A clause with no positive literal concludes falsehood
+        if p is None:
+            return None
+        if p in inferred:
+            continue
+        inferred.add(p)
+        for i in premise_of.get(p, []):
+            count[i] -= 1
+            if count[i] == 0:
+                agenda.append(conclusion[i])
+    return inferred
+
+
+def forward_chaining(knowledge, query):
+    """
+    Checks if knowledge base entails query by forward chaining.
+
+    Only applies when the knowledge base is made of Horn clauses and the
+    query is a literal or a conjunction of symbols.
+    """
+    kb = clauses(knowledge)
+    if not all(horn(clause) for clause in kb):
+        raise ValueError("knowledge base is not in Horn form")
+
+    # Not(P) is entailed exactly when adding P makes the KB inconsistent
+    if isinstance(query, Not) and isinstance(query.operand, Symbol):
+        fact = frozenset([(query.operand.name, True)])
+        return forward_chain(kb | {fact}) is None
+
+    goals = _atoms(query)
+    if goals is None:
+        raise ValueError("query is not a conjunction of symbols")
+    inferred = forward_chain(kb)
+    return inferred is None or goals <= inferred
+
+
+def _atoms(query):
+    """Returns the names in a symbol or conjunction of symbols, or None."""
+    if isinstance(query, Symbol):
+        return {query.name}
+    if isinstance(query, And):
+        names = set()
+        for conjunct in query.conjuncts:
+            atoms = _atoms(conjunct)
+            if atoms is None:
+                return None
+            names |= atoms
+        return names
+    return None
+
+
+def resolvents(ci, cj):
+    """Returns all non-tautological resolvents of two clauses."""
+    result = []
+    for name, polarity in ci:
+        if (name, not polarity) in cj:
+            resolvent = ((ci - {(name, polarity)})
+                         | (cj - {(name, not polarity)}))
+            if not tautology(resolvent):
+                result.append(resolvent)
+    return result
+
+
+def refute(usable, support):
+    """
+    Checks whether a set of clauses is unsatisfiable, by resolution
+    restricted to a set of support.
+
+    Every resolution step uses at least one clause derived from
+    `support`, shortest clauses first. New clauses subsumed by a kept
+    clause are discarded, and kept clauses subsumed by a new clause are
+    removed. Refutation complete whenever `usable` is satisfiable.
+    """
+    kept = set()
+    for clause in sorted(usable, key=len):
+        if not subsumed(clause, kept):
+            kept.add(clause)
+
+    counter = itertools.count()
+    queue = [(len(clause), next(counter), clause) for clause in support]
+    heapq.heapify(queue)
+    while queue:
+        _, _, given = heapq.heappop(queue)
+        if not given:
+            return True
+        if subsumed(given, kept):
+            continue
+        kept = {clause for clause in kept if not given <= clause}
+        for other in kept:
+            for resolvent in resolvents(given, other):
+                if not resolvent:
+                    return True
+                if not subsumed(resolvent, kept):
+                    heapq.heappush(
+                        queue, (len(resolvent), next(counter), resolvent)
+                    )
+        kept.add(given)
+    return False
+
+
+def subsumed(clause, kept):
+    """Checks whether any kept clause is a subset of `clause`."""
+    return any(other <= clause for other in kept)
+
+
+def satisfiable(kb):
+    """Checks whether a set of clauses has a model, by DPLL search."""
+    kb = list(kb)
+    if not kb:
+        return True
+    if any(not clause for clause in kb):
+        return False
+
+    # Propagate a unit clause if there is one, otherwise branch
+    unit = next((clause for clause in kb if len(clause) == 1), None)
+    if unit is not None:
+        literals = [next(iter(unit))]
+    else:
+        name, _ = next(iter(kb[0]))
+        literals = [(name, True), (name, False)]
+    for name, polarity in literals:
+        reduced = [
+            clause - {(name, not polarity)}
+            for clause in kb if (name, polarity) not in clause
+        ]
+        if satisfiable(reduced):
+            return True
+    return False
+
+
+def resolution(knowledge, query):
+    """
+    Checks if knowledge base entails query by refuting
+    knowledge and not query, with the negated query as set of support.
+    """
+    kb = clauses(knowledge)
+    if refute(kb, clauses(Not(query))):
+        return True
+
+    # Set of support is only complete for a satisfiable knowledge base
+    return not satisfiable(kb)
+
+
+def select_engine(knowledge, query):
+    """
+    Returns the name of the cheapest engine that can decide whether
+    knowledge base entails query.
+    """
+    kb = clauses(knowledge)
+    literal = isinstance(query, Not) and isinstance(query.operand, Symbol)
+    if (literal or _atoms(query) is not None) and all(
+        horn(clause) for clause in kb
+    ):
+        return "forward_chaining"
+    symbols = set.union(knowledge.symbols(), query.symbols())
+    if len(symbols) <= MODEL_CHECK_SYMBOLS:
+        return "model_check"
+    return "resolution"
+
+
+ENGINES = {
+    "forward_chaining": forward_chaining,
+    "model_check": model_check,
+    "resolution": resolution,
+}
+
+
+def entails(knowledge, query):
+    """Checks if knowledge base entails query, using the cheapest engine."""
+    return ENGINES[select_engine(knowledge, query)](knowledge, query)
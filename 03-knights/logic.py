@@ -1,4 +1,5 @@
 import itertools
+import multiprocessing
 
 
 class Sentence():
@@ -127,7 +128,9 @@ class And(Sentence):
                            for conjunct in self.conjuncts])
 
     def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+        return set().union(
+            *[conjunct.symbols() for conjunct in self.conjuncts]
+        )
 
 
 class Or(Sentence):
@@ -158,7 +161,9 @@ class Or(Sentence):
                             for disjunct in self.disjuncts])
 
     def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+        return set().union(
+            *[disjunct.symbols() for disjunct in self.disjuncts]
+        )
 
 
 class Implication(Sentence):
@@ -261,3 +266,47 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def model_check_parallel(knowledge, query, split=None, processes=None):
+    """
+    Checks if knowledge base entails query, using a pool of processes.
+
+    The assignment space is split on the first `split` symbols, and each
+    partition is checked by a separate worker. As soon as any worker finds
+    a model where knowledge is true but query is false, the pool is
+    terminated and the remaining partitions are abandoned.
+    """
+
+    # Get all symbols in both knowledge and query, in a stable order
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+
+    # By default, make a few partitions per worker to balance the load
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if split is None:
+        split = (4 * processes).bit_length()
+    split = max(0, min(split, len(symbols)))
+
+    prefix, remaining = symbols[:split], symbols[split:]
+    partitions = (
+        (knowledge, query, remaining, dict(zip(prefix, values)))
+        for values in itertools.product((True, False), repeat=split)
+    )
+
+    # Leaving the `with` block terminates any worker still running
+    with multiprocessing.Pool(processes) as pool:
+        for entailed in pool.imap_unordered(_check_partition, partitions):
+            if not entailed:
+                return False
+    return True
+
+
+def _check_partition(args):
+    """Checks entailment over every completion of a partial model."""
+    knowledge, query, symbols, model = args
+    for values in itertools.product((True, False), repeat=len(symbols)):
+        model.update(zip(symbols, values))
+        if knowledge.evaluate(model) and not query.evaluate(model):
+            return False
+    return True
@@ -0,0 +1,229 @@
+from inference import clauses
+from logic import *
+
+
+def true():
+    """
+    Returns a new true sentence, an empty conjunction. Sentences can be
+    added to, so constants are built afresh rather than shared.
+    """
+    return And()
+
+
+def false():
+    """Returns a new false sentence, an empty disjunction."""
+    return Or()
+
+
+def is_true(sentence):
+    return isinstance(sentence, And) and not sentence.conjuncts
+
+
+def is_false(sentence):
+    return isinstance(sentence, Or) and not sentence.disjuncts
+
+
+def size(sentence):
+    """Returns the number of nodes in a logical sentence."""
+    if isinstance(sentence, Symbol):
+        return 1
+    if isinstance(sentence, Not):
+        return 1 + size(sentence.operand)
+    if isinstance(sentence, And):
+        return 1 + sum(size(conjunct) for conjunct in sentence.conjuncts)
+    if isinstance(sentence, Or):
+        return 1 + sum(size(disjunct) for disjunct in sentence.disjuncts)
+    if isinstance(sentence, Implication):
+        return 1 + size(sentence.antecedent) + size(sentence.consequent)
+    if isinstance(sentence, Biconditional):
+        return 1 + size(sentence.left) + size(sentence.right)
+    raise TypeError(f"unknown sentence {sentence}")
+
+
+def negate(sentence):
+    """Returns the negation of a sentence, removing a double negation."""
+    if isinstance(sentence, Not):
+        return sentence.operand
+    if is_true(sentence):
+        return false()
+    if is_false(sentence):
+        return true()
+    return Not(sentence)
+
+
+def simplify(sentence):
+    """
+    Returns an equivalent sentence with trivial redundancy removed.
+
+    Nested conjunctions and disjunctions are flattened, double negations
+    removed, constants folded, repeated operands dropped, and a clause
+    whose literals include those of another conjunct is removed.
+    """
+    if isinstance(sentence, Symbol):
+        return sentence
+    if isinstance(sentence, Not):
+        return negate(simplify(sentence.operand))
+    if isinstance(sentence, And):
+        return _junction(And, [simplify(c) for c in sentence.conjuncts])
+    if isinstance(sentence, Or):
+        return _junction(Or, [simplify(d) for d in sentence.disjuncts])
+    if isinstance(sentence, Implication):
+        antecedent = simplify(sentence.antecedent)
+        consequent = simplify(sentence.consequent)
+        if is_false(antecedent) or is_true(consequent):
+            return true()
+        if is_true(antecedent):
+            return consequent
+        if is_false(consequent):
+            return negate(antecedent)
+        if antecedent == consequent:
+            return true()
+        return Implication(antecedent, consequent)
+    if isinstance(sentence, Biconditional):
+        left = simplify(sentence.left)
+        right = simplify(sentence.right)
+        if left == right:
+            return true()
+        for a, b in [(left, right), (right, left)]:
+            if is_true(a):
+                return b
+            if is_false(a):
+                return negate(b)
+        if negate(left) == right:
+            return false()
+        return Biconditional(left, right)
+    raise TypeError(f"unknown sentence {sentence}")
+
+
+def _junction(kind, operands):
+    """Builds a simplified And or Or from already simplified operands."""
+    if kind is And:
+        is_unit, is_zero, zero = is_true, is_false, false
+    else:
+        is_unit, is_zero, zero = is_false, is_true, true
+
+    # Flatten operands of the same kind, and drop duplicates and units
+    flat = []
+    seen = set()
+    for operand in operands:
+        nested = _operands(operand) if isinstance(operand, kind) else None
+        for item in nested if nested is not None else [operand]:
+            if is_unit(item) or item in seen:
+                continue
+            if is_zero(item) or negate(item) in seen:
+                return zero()
+            seen.add(item)
+            flat.append(item)
+
+    if kind is And:
+        flat = _drop_subsumed(flat)
+    if not flat:
+        return kind()
+    if len(flat) == 1:
+        return flat[0]
+    return kind(*flat)
+
+
+def _operands(sentence):
+    if isinstance(sentence, And):
+        return sentence.conjuncts
+    return sentence.disjuncts
+
+
+def _drop_subsumed(conjuncts):
+    """Removes clauses whose literals include those of another clause."""
+    literals = [_literals(conjunct) for conjunct in conjuncts]
+    kept = []
+    for i, conjunct in enumerate(conjuncts):
+        if literals[i] is not None and any(
+            other is not None and (other < literals[i]
+                                   or other == literals[i] and j < i)
+            for j, other in enumerate(literals)
+        ):
+            continue
+        kept.append(conjunct)
+    return kept
+
+
+def _literals(sentence):
+    """Returns the literals of a clause as a frozenset, or None."""
+    items = sentence.disjuncts if isinstance(sentence, Or) else [sentence]
+    literals = set()
+    for item in items:
+        if isinstance(item, Symbol):
+            literals.add(item)
+        elif isinstance(item, Not) and isinstance(item.operand, Symbol):
+            literals.add(item)
+        else:
+            return None
+    return frozenset(literals)
+
+
+def nnf(sentence, positive=True):
+    """
+    Returns a sentence in negation normal form, with negations only
+    applied to symbols and no implications or biconditionals.
+    """
+    if isinstance(sentence, Symbol):
+        return sentence if positive else Not(sentence)
+    if isinstance(sentence, Not):
+        return nnf(sentence.operand, not positive)
+    if isinstance(sentence, (And, Or)):
+        operands = [nnf(operand, positive) for operand in _operands(sentence)]
+        same = isinstance(sentence, And) == positive
+        return And(*operands) if same else Or(*operands)
+    if isinstance(sentence, Implication):
+        return nnf(Or(Not(sentence.antecedent), sentence.consequent), positive)
+    if isinstance(sentence, Biconditional):
+        left, right = sentence.left, sentence.right
+        return nnf(
+            And(Or(Not(left), right), Or(left, Not(right))), positive
+        )
+    raise TypeError(f"unknown sentence {sentence}")
+
+
+def cnf(sentence):
+    """
+    Returns a sentence in conjunctive normal form, as a conjunction of
+    clauses with subsumed and tautological clauses removed.
+    """
+    kept = []
+    for clause in sorted(clauses(sentence), key=lambda c: (len(c), sorted(c))):
+        if not any(other <= clause for other in kept):
+            kept.append(clause)
+    if frozenset() in kept:
+        return false()
+    return simplify(And(*[
+        Or(*[
+            Symbol(name) if polarity else Not(Symbol(name))
+            for name, polarity in sorted(clause)
+        ])
+        for clause in kept
+    ]))
+
+
+FORMS = {
+    None: lambda sentence: sentence,
+    "nnf": nnf,
+    "cnf": cnf,
+}
+
+
+def pipeline(sentence, form=None):
+    """
+    Simplifies a sentence, optionally converting it to "nnf" or "cnf".
+
+    Returns a tuple (result, before, after), where `before` and `after`
+    are the sizes of the sentence in nodes before and after rewriting.
+    """
+    result = simplify(FORMS[form](simplify(sentence)))
+    return result, size(sentence), size(result)
+
+
+def model_check_simplified(knowledge, query, form=None):
+    """
+    Checks if knowledge base entails query, simplifying the knowledge
+    base once before enumerating models.
+    """
+    knowledge, _, _ = pipeline(knowledge, form)
+    return model_check(knowledge, query)
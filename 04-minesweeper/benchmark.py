@@ -0,0 +1,30 @@
+import sys
+
+from simulate import percentile, play
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python benchmark.py [games]")
+    games = int(sys.argv[1]) if len(sys.argv) == 2 else 20
+    height, width, mines = 16, 30, 99
+
+    print(f"{games} games on {width}x{height} with {mines} mines")
+    for deduction in ["subset", "linear"]:
+        wins = 0
+        latencies = []
+        for seed in range(games):
+            won, moves = play(height, width, mines, seed, deduction)
+            wins += won
+            latencies.extend(moves)
+
+        print(f"{deduction} deduction: {wins} won, {len(latencies)} moves")
+        print(f"  mean: {1000 * sum(latencies) / len(latencies):.3f} ms")
+        for fraction in [0.5, 0.9, 0.99]:
+            print(f"  p{int(100 * fraction)}: "
+                  f"{1000 * percentile(latencies, fraction):.3f} ms")
+        print(f"  max: {1000 * max(latencies):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+from fractions import Fraction
+
+from probability import components
+
+
+class LinearDeduction():
+    """
+    Deduces mines and safe cells from frontier constraints by Gaussian
+    elimination over each independent component
+    """
+
+    def __init__(self, cache_size=4096):
+
+        # Components already known to yield no deduction
+        self.barren = set()
+        self.cache_size = cache_size
+
+    def deduce(self, constraints):
+        """
+        Returns a pair (mines, safes) of sets of cells that every 0/1
+        assignment satisfying the (cells, count) constraints agrees on.
+        """
+        constraints = frozenset(
+            (frozenset(cells), count) for cells, count in constraints if cells
+        )
+        mines = set()
+        safes = set()
+        for group in components(constraints):
+            if group in self.barren:
+                continue
+            known = solve(group)
+            if not known:
+                if len(self.barren) >= self.cache_size:
+                    self.barren.clear()
+                self.barren.add(group)
+            for cell, value in known.items():
+                (mines if value else safes).add(cell)
+        return mines, safes
+
+
+def solve(constraints):
+    """
+    Returns a dictionary mapping cells to 1 (mine) or 0 (safe) for every
+    cell whose value follows from the constraints.
+
+    Alternates two steps until neither finds anything new: reduce the
+    system to row echelon form, then check each row's 0/1 bounds. A row
+    whose right-hand side equals the sum of its positive coefficients
+    forces those cells to be mines and its negative-coefficient cells
+    to be safe, and symmetrically for the sum of negative coefficients.
+    """
+    known = dict()
+    while True:
+        rows = []
+        for cells, count in constraints:
+            row = {cell: Fraction(1) for cell in cells if cell not in known}
+            total = count - sum(known.get(cell, 0) for cell in cells)
+            if row:
+                rows.append((row, Fraction(total)))
+
+        found = dict()
+        for row, total in rows + eliminate(rows):
+            for cell, value in bounds(row, total).items():
+                found[cell] = value
+        if not found:
+            return known
+        known.update(found)
+
+
+def eliminate(rows):
+    """
+    Returns the rows of the reduced row echelon form of a sparse system,
+    where each row is a pair (coefficients, total) and coefficients map
+    variables to nonzero Fractions.
+    """
+    reduced = []
+    pivots = dict()
+    for coefficients, total in rows:
+        row = dict(coefficients)
+        for variable, index in pivots.items():
+            if variable in row:
+                row, total = subtract(
+                    row, total, reduced[index], row[variable]
+                )
+        if not row:
+            continue
+
+        # Normalize on a pivot, and remove it from every earlier row
+        pivot = min(row)
+        scale = row[pivot]
+        row = {variable: value / scale for variable, value in row.items()}
+        total = total / scale
+        for index, (other, other_total) in enumerate(reduced):
+            if pivot in other:
+                reduced[index] = subtract(
+                    other, other_total, (row, total), other[pivot]
+                )
+        pivots[pivot] = len(reduced)
+        reduced.append((row, total))
+    return reduced
+
+
+def subtract(row, total, other, factor):
+    """Returns row - factor * other, dropping zero coefficients."""
+    other_row, other_total = other
+    result = dict(row)
+    for variable, value in other_row.items():
+        result[variable] = result.get(variable, 0) - factor * value
+        if result[variable] == 0:
+            del result[variable]
+    return result, total - factor * other_total
+
+
+def bounds(row, total):
+    """
+    Returns the values forced on a row's variables when its total equals
+    the largest or smallest value the row can take over 0/1 variables.
+    """
+    highest = sum(value for value in row.values() if value > 0)
+    lowest = sum(value for value in row.values() if value < 0)
+    if total == highest:
+        return {variable: int(value > 0) for variable, value in row.items()}
+    if total == lowest:
+        return {variable: int(value < 0) for variable, value in row.items()}
+    return dict()
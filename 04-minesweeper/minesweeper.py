@@ -1,7 +1,16 @@
-import copy
+import collections
+import collections.abc
 import itertools
+import logging
 import random
 
+import numpy as np
+
+from linear import LinearDeduction
+from probability import MineProbability
+
+logger = logging.getLogger(__name__)
+
 
 class Minesweeper():
     """
@@ -13,27 +22,47 @@ class Minesweeper():
         # Set initial width, height, and number of mines
         self.height = height
         self.width = width
-        self.mines = set()
-
-        # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
-
-        # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
+        self.mine_count = mines
+
+        # Place mines at distinct random positions, drawing the generator's
+        # seed from `random` so that seeding `random` still fixes the board
+        rng = np.random.default_rng(random.getrandbits(64))
+        positions = rng.choice(height * width, size=mines, replace=False)
+        field = np.zeros(height * width, dtype=bool)
+        field[positions] = True
+
+        # Store mines as a flat bit array, one bit per cell
+        self.board = np.packbits(field)
+
+        # Count neighbouring mines for every cell at once, by summing the
+        # eight shifted copies of the zero-padded field
+        padded = np.pad(field.reshape(height, width), 1)
+        counts = np.zeros((height, width), dtype=np.uint8)
+        for di in range(3):
+            for dj in range(3):
+                if (di, dj) != (1, 1):
+                    counts += padded[di:di + height, dj:dj + width]
+        self.counts = counts
+
+        self._mines = None
 
         # At first, player has found no mines
         self.mines_found = set()
 
+    @property
+    def mines(self):
+        """
+        Set of all mine cells, built on first use since it is much
+        larger than the bit array on big boards.
+        """
+        if self._mines is None:
+            field = np.unpackbits(
+                self.board, count=self.height * self.width
+            ).reshape(self.height, self.width)
+            rows, columns = field.nonzero()
+            self._mines = set(zip(rows.tolist(), columns.tolist()))
+        return self._mines
+
     def print(self):
         """
         Prints a text-based representation
@@ -42,7 +71,7 @@ class Minesweeper():
         for i in range(self.height):
             print("--" * self.width + "-")
             for j in range(self.width):
-                if self.board[i][j]:
+                if self.is_mine((i, j)):
                     print("|X", end="")
                 else:
                     print("| ", end="")
@@ -51,7 +80,8 @@ class Minesweeper():
 
     def is_mine(self, cell):
         i, j = cell
-        return self.board[i][j]
+        index = i * self.width + j
+        return bool(self.board[index >> 3] & (0x80 >> (index & 7)))
 
     def nearby_mines(self, cell):
         """
@@ -59,24 +89,35 @@ class Minesweeper():
         within one row and column of a given cell,
         not including the cell itself.
         """
+        return int(self.counts[cell])
 
-        # Keep count of nearby mines
-        count = 0
-
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
+    def reveal(self, cell, revealed=()):
+        """
+        Reveals a safe cell, along with the whole connected region of
+        cells with no neighbouring mines around it and that region's
+        border, skipping any cell in `revealed`.
 
-        return count
+        Returns a list of (cell, count) pairs for every cell revealed,
+        where `count` is the cell's number of neighbouring mines.
+        """
+        if self.is_mine(cell):
+            raise ValueError(f"cannot reveal mine at {cell}")
+        result = [(cell, self.nearby_mines(cell))]
+        seen = {cell}
+        queue = collections.deque([cell])
+        while queue:
+            i, j = queue.popleft()
+            if self.counts[i, j] != 0:
+                continue
+            for ni in range(max(i - 1, 0), min(i + 2, self.height)):
+                for nj in range(max(j - 1, 0), min(j + 2, self.width)):
+                    neighbour = (ni, nj)
+                    if neighbour in seen or neighbour in revealed:
+                        continue
+                    seen.add(neighbour)
+                    result.append((neighbour, int(self.counts[ni, nj])))
+                    queue.append(neighbour)
+        return result
 
     def won(self):
         """
@@ -90,61 +131,205 @@ class Sentence():
     Logical statement about a Minesweeper game
     A sentence consists of a set of board cells,
     and a count of the number of those cells which are mines.
+
+    Cell (i, j) has index i * width + j, where `width` is the board's
+    width, and cells are stored as bits of an integer mask relative to
+    `base`, the index of the lowest cell, so a sentence about a cell's
+    neighbours takes at most 2 * width + 3 bits wherever it is on the
+    board. Sentences are immutable, so they can be hashed, and the set
+    operations between them are a shift and a few integer operations.
+    Set operations need both sentences to have the same width, as their
+    indices mean different cells otherwise.
     """
 
-    def __init__(self, cells, count):
-        self.cells = set(cells)
-        self.count = count
+    __slots__ = ("base", "mask", "count", "width")
+
+    def __init__(self, cells, count, width):
+        indices = [i * width + j for i, j in cells]
+        base = min(indices, default=0)
+        mask = 0
+        for index in indices:
+            mask |= 1 << (index - base)
+        object.__setattr__(self, "base", base)
+        object.__setattr__(self, "mask", mask)
+        object.__setattr__(self, "count", count)
+        object.__setattr__(self, "width", width)
+
+    @classmethod
+    def from_mask(cls, base, mask, count, width):
+        """
+        Returns a sentence over the cells whose bits are set in `mask`,
+        bit k standing for the cell of index base + k.
+        """
+        if mask:
+            shift = (mask & -mask).bit_length() - 1
+            base += shift
+            mask >>= shift
+        else:
+            base = 0
+        sentence = cls.__new__(cls)
+        object.__setattr__(sentence, "base", base)
+        object.__setattr__(sentence, "mask", mask)
+        object.__setattr__(sentence, "count", count)
+        object.__setattr__(sentence, "width", width)
+        return sentence
+
+    def __setattr__(self, name, value):
+        raise AttributeError("sentences are immutable")
 
     def __eq__(self, other):
-        return self.cells == other.cells and self.count == other.count
+        if not isinstance(other, Sentence):
+            return NotImplemented
+        if self.width == other.width:
+            return self.key == other.key and self.count == other.count
+        return (self.cells, self.count) == (other.cells, other.count)
+
+    def __hash__(self):
+        # The lowest cell is the same whatever the width, so sentences
+        # that are equal across widths hash alike
+        return hash((divmod(self.base, self.width), self.mask.bit_count(),
+                     self.count))
+
+    def __len__(self):
+        return self.mask.bit_count()
 
     def __str__(self):
-        return f"{self.cells} = {self.count}"
+        return f"{set(self.cells)} = {self.count}"
+
+    @property
+    def key(self):
+        """
+        Pair (base, mask), which identifies the cells of the sentence.
+        """
+        return self.base, self.mask
+
+    @property
+    def cells(self):
+        """
+        Frozenset of the cells in the sentence.
+        """
+        cells = []
+        mask = self.mask
+        while mask:
+            low = mask & -mask
+            cells.append(divmod(self.base + low.bit_length() - 1, self.width))
+            mask ^= low
+        return frozenset(cells)
+
+    def bit(self, cell):
+        """
+        Returns the bit of a cell in the mask, which is 0 for cells
+        before the lowest cell of the sentence.
+        """
+        i, j = cell
+        index = i * self.width + j - self.base
+        return 1 << index if index >= 0 else 0
+
+    def align(self, other):
+        """
+        Returns a tuple (base, mine, theirs) of the masks of self and
+        `other` relative to the lower base of the two.
+        """
+        if self.width != other.width:
+            raise ValueError(
+                f"sentences of widths {self.width} and {other.width}"
+            )
+        base = min(self.base, other.base)
+        return (base, self.mask << (self.base - base),
+                other.mask << (other.base - base))
+
+    def issubset(self, other):
+        _, mine, theirs = self.align(other)
+        return mine & theirs == mine
+
+    def difference(self, other):
+        """
+        Returns the sentence about the cells of self outside `other`,
+        given that `other`'s cells are all in self.
+        """
+        base, mine, theirs = self.align(other)
+        return Sentence.from_mask(
+            base, mine & ~theirs, self.count - other.count, self.width
+        )
 
     def known_mines(self):
         """
         Returns the set of all cells in self.cells known to be mines.
         """
-        if len(self.cells)==self.count:
+        if len(self) == self.count:
             return self.cells
-        
         return None
-        
-                
-
-        
 
     def known_safes(self):
         """
         Returns the set of all cells in self.cells known to be safe.
         """
-        if self.count==0:
+        if self.count == 0:
             return self.cells
         return None
 
-        
-        
-
     def mark_mine(self, cell):
         """
-        Updates internal knowledge representation given the fact that
+        Returns the sentence updated with the fact that
         a cell is known to be a mine.
         """
-        if cell in self.cells:
-            self.cells.remove(cell)
-            self.count-=1
+        bit = self.bit(cell)
+        if not self.mask & bit:
+            return self
+        return Sentence.from_mask(
+            self.base, self.mask & ~bit, self.count - 1, self.width
+        )
+
+    def mark_safe(self, cell):
+        """
+        Returns the sentence updated with the fact that
+        a cell is known to be safe.
+        """
+        bit = self.bit(cell)
+        if not self.mask & bit:
+            return self
+        return Sentence.from_mask(
+            self.base, self.mask & ~bit, self.count, self.width
+        )
+
 
+class IndexedSet(collections.abc.Sequence):
+    """
+    Set of cells that also supports indexing, so that membership tests,
+    insertion, removal and random choice all take constant time
+    """
 
+    def __init__(self, items=()):
+        self.items = []
+        self.positions = dict()
+        for item in items:
+            self.add(item)
 
+    def __contains__(self, item):
+        return item in self.positions
 
-    def mark_safe(self, cell):
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, item):
+        if item not in self.positions:
+            self.positions[item] = len(self.items)
+            self.items.append(item)
+
+    def discard(self, item):
         """
-        Updates internal knowledge representation given the fact that
-        a cell is known to be safe.
+        Removes an item if present, by moving the last item into its slot.
         """
-        if cell in self.cells:
-            self.cells.remove(cell)
+        position = self.positions.pop(item, None)
+        if position is None:
+            return
+        last = self.items.pop()
+        if position < len(self.items):
+            self.items[position] = last
+            self.positions[last] = position
 
 
 class MinesweeperAI():
@@ -152,21 +337,98 @@ class MinesweeperAI():
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mines=8, deduction="linear"):
 
-        # Set initial height and width
+        # Set initial height, width, and total number of mines
         self.height = height
         self.width = width
+        self.mine_count = mines
+
+        # "subset" only reduces pairs of sentences, while "linear" also
+        # solves the frontier as a linear system once that runs dry
+        if deduction not in ["subset", "linear"]:
+            raise ValueError(f"unknown deduction engine {deduction}")
+        self.deduction = deduction
+        self.linear = LinearDeduction()
 
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
+        # Cells not yet clicked on nor known to be mines
+        self.unexplored = IndexedSet(
+            itertools.product(range(height), range(width))
+        )
+
+        # Known safe cells not yet clicked on, oldest first; cells that
+        # get clicked on are dropped lazily when they reach the front
+        self.ready = collections.deque()
+
         # Keep track of cells known to be safe or mines
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Sentences about the game known to be true, keyed by their
+        # Sentence.key;
+        # no sentence's cells are a subset of another's
+        self.knowledge = dict()
+
+        # Map from each cell to the keys of sentences that contain it
+        self.index = dict()
+
+        # Keys of sentences added since they were last checked
+        self.unchecked = set()
+
+        # Estimates mine probabilities when no safe move is known
+        self.probability = MineProbability()
+
+    def add_sentence(self, sentence):
+        """
+        Adds a sentence to the knowledge base and indexes it by cell.
+
+        A sentence whose cells match an existing sentence's is dropped.
+        A sentence with another sentence's cells as a subset is reduced
+        to their difference, and a sentence whose cells are a subset of
+        others' replaces each of those with the difference instead.
+        """
+        pending = [sentence]
+        while pending:
+            sentence = pending.pop()
+            if not sentence.mask or sentence.key in self.knowledge:
+                continue
+            cells = sentence.cells
+            neighbours = set()
+            for cell in cells:
+                neighbours |= self.index.get(cell, set())
+
+            subset = next(
+                (key for key in neighbours
+                 if self.knowledge[key].issubset(sentence)),
+                None
+            )
+            if subset is not None:
+                pending.append(sentence.difference(self.knowledge[subset]))
+                continue
+            for key in neighbours:
+                if sentence.issubset(self.knowledge[key]):
+                    other = self.remove_sentence(key)
+                    pending.append(other.difference(sentence))
+
+            self.knowledge[sentence.key] = sentence
+            for cell in cells:
+                self.index.setdefault(cell, set()).add(sentence.key)
+            self.unchecked.add(sentence.key)
+
+    def remove_sentence(self, key):
+        """
+        Removes a sentence from the knowledge base and from the index,
+        and returns it.
+        """
+        sentence = self.knowledge.pop(key)
+        self.unchecked.discard(key)
+        for cell in sentence.cells:
+            if cell in self.index:
+                self.index[cell].discard(key)
+        return sentence
 
     def mark_mine(self, cell):
         """
@@ -174,17 +436,28 @@ class MinesweeperAI():
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self.unexplored.discard(cell)
+        updated = [
+            self.remove_sentence(key).mark_mine(cell)
+            for key in self.index.pop(cell, ())
+        ]
+        for sentence in updated:
+            self.add_sentence(sentence)
 
     def mark_safe(self, cell):
         """
         Marks a cell as safe, and updates all knowledge
         to mark that cell as safe as well.
         """
+        if cell not in self.safes and cell not in self.moves_made:
+            self.ready.append(cell)
         self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        updated = [
+            self.remove_sentence(key).mark_safe(cell)
+            for key in self.index.pop(cell, ())
+        ]
+        for sentence in updated:
+            self.add_sentence(sentence)
 
     def add_knowledge(self, cell, count):
         """
@@ -201,83 +474,89 @@ class MinesweeperAI():
             5) add any new sentences to the AI's knowledge base
                if they can be inferred from existing knowledge
         """
+        self.add_knowledge_batch([(cell, count)])
+
+    def add_knowledge_batch(self, revealed):
+        """
+        Adds knowledge for several revealed cells at once, given as
+        (cell, count) pairs, and runs a single propagation pass
+        over the resulting knowledge base.
+        """
         # 1) mark cell al move that has been make
-        
-        self.moves_made.add(cell)
         # 2) mark the cell as safe
-        self.safes.add(cell)
+        # done for the whole batch first, so that no new sentence
+        # includes a cell revealed in the same batch
+        for cell, _ in revealed:
+            self.moves_made.add(cell)
+            self.unexplored.discard(cell)
+            self.mark_safe(cell)
+
         # 3) add a new sentence to the AI's knowledge base
         #        based on the value of `cell` and `count`
+        for cell, count in revealed:
+            arr_cells=self.around_cells(cell)
+            copy_count=count
+            cells=set()
+            for c in arr_cells:
+                if c in self.mines:
+                    copy_count-=1
+                elif c not in self.safes:
+                    cells.add(c)
+
+            # add new sentance fo knowledge
+            st=Sentence(cells,copy_count,self.width)
+            if len(st)>0:
+                self.add_sentence(st)
 
-        arr_cells=self.around_cells(cell)
-        copy_count=copy.deepcopy(count)
-        cells=set()
-        for c in arr_cells:
-            if c in self.safes:
-                copy_count-=1
-            elif c not in self.safes | self.mines:
-                cells.add(c)
-
-        # add new sentance fo knowledge
-        st=Sentence(cells,count)
-        if len(st.cells)>0:
-            self.knowledge.append(st)
-            # print(f'add new sentence to knowldge {st}')
-        
-        # print(f"knowldge: ")
-        # for sen in self.knowledge:
-        #     print(sen)
-
-        
         # 4) mark any additional cells as safe or as mines
         #        if it can be concluded based on the AI's knowledge base
-        self.check_knowldge()
-        print('-'*20)
-        print(f'safe node after check{self.safes}')
-        
-        
-
-
         # 5) add any new sentences to the AI's knowledge base
         #        if they can be inferred from existing knowledge
-        self.extra_sent()
-        print('-'*20)
-        print(f'safe node after extra{self.safes}')
-
-
-        
+        # subset inference happens as sentences are added, and marking
+        # cells adds updated sentences, so check until nothing changes
+        while True:
+            self.check_knowldge()
+            if self.deduction != "linear" or not self.solve_linear():
+                break
+        logger.debug("safe cells after inference %s", self.safes)
 
     def check_knowldge(self):
-        # make deepcopy of knoledge to perform on it
-        copy_know=copy.deepcopy(self.knowledge)
-        for sent in copy_know:
-            # if sentence is empy remove form knowledge
-            if len(sent.cells)==0:
-                try:
-                    self.knowledge.remove(sent)
-                except ValueError:
-                    pass
-            #print(f'current sentence cells{sent.cells}')
+        """
+        Marks every cell determined by a single sentence, working
+        through the changed sentences until none is left.
+        """
+        while self.unchecked:
+            key = self.unchecked.pop()
+            sent = self.knowledge.get(key)
+            if sent is None:
+                continue
             mines = sent.known_mines()
             safes = sent.known_safes()
-            #print(f"return cells {safes}")
-            # add all mine to self.mine
+            # marking a cell can change other sentences, which puts
+            # them back on the worklist
             if mines:
-                for mine in mines:
-                    print('-'*20)
-                    print(f'mark {mine} as mine')
-                    print('-'*20)
+                for mine in list(mines):
+                    logger.debug("mark %s as mine", mine)
                     self.mark_mine(mine)
-                    self.check_knowldge()
-            
-            # add all safe to self.safes
-            if safes:
-                for safe in safes:
-                    print('-'*20)
-                    print(f'mark {safe} as safe')
-                    print('-'*20)
+            elif safes:
+                for safe in list(safes):
+                    logger.debug("mark %s as safe", safe)
                     self.mark_safe(safe)
-                    self.check_knowldge()    
+
+    def solve_linear(self):
+        """
+        Marks the mines and safe cells found by solving the knowledge
+        base as a linear system. Returns whether anything was marked.
+        """
+        mines, safes = self.linear.deduce(
+            (sentence.cells, sentence.count)
+            for sentence in self.knowledge.values()
+        )
+        for mine in mines:
+            self.mark_mine(mine)
+        for safe in safes:
+            self.mark_safe(safe)
+        return bool(mines or safes)
 
     def around_cells(self,cell):
         a_cells=set()
@@ -292,27 +571,6 @@ class MinesweeperAI():
         
         return a_cells
     
-    def extra_sent(self):
-        # loop on knowldge to check if any one 
-        # is sub set on another one
-        for sent1 in self.knowledge:
-            for sent2 in self.knowledge:
-                if sent1.cells.issubset(sent2.cells):
-                    new_cell=sent2.cells - sent1.cells
-                    new_count=sent2.count - sent1.count
-                    new_sent=Sentence(new_cell,new_count)
-                    mines=new_sent.known_mines()
-                    safes=new_sent.known_safes()
-
-                    if mines:
-                        for mine in mines:
-                            self.mark_mine(mine)
-                    if safes:
-                        for safe in safes:
-                            self.mark_safe(safe)
-
-        
-
     def make_safe_move(self):
         """
         Returns a safe cell to choose on the Minesweeper board.
@@ -322,32 +580,37 @@ class MinesweeperAI():
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        for cell in self.safes:
-            if cell not in self.moves_made|self.mines:
-                print('='*20)
-                print(f'current AI move {cell}')
-                print('='*20)
-                return cell
+        while self.ready and self.ready[0] in self.moves_made:
+            self.ready.popleft()
+        if self.ready:
+            cell = self.ready[0]
+            logger.info("current AI move %s", cell)
+            return cell
+        return None
 
     def make_random_move(self):
         """
         Returns a move to make on the Minesweeper board.
-        Should choose randomly among cells that:
+        Should choose among cells that:
             1) have not already been chosen, and
             2) are not known to be mines
+        picking the cell least likely to be a mine given the knowledge
+        base and the total mine count, randomly among equally safe cells.
         """
-        maxmoves = self.width * self.height
-
-        while maxmoves > 0:
-            maxmoves -= 1
-
-            row = random.randrange(self.height)
-            column = random.randrange(self.width)
-
-            if (row, column) not in self.moves_made | self.mines:
-                print('='*20)
-                print(f'current random move {(row,column)}')
-                print('='*20)
-                return (row, column)
-
-        return None
+        if not self.unexplored:
+            return None
+
+        # a known safe cell is certainly the safest choice
+        move = self.make_safe_move()
+        if move is not None:
+            return move
+
+        constraints = [
+            (sentence.cells, sentence.count)
+            for sentence in self.knowledge.values()
+        ]
+        move = self.probability.safest(
+            constraints, self.unexplored, self.mine_count - len(self.mines)
+        )
+        logger.info("current random move %s", move)
+        return move
@@ -0,0 +1,319 @@
+import collections.abc
+import math
+import random
+
+
+class TooManyConfigurations(Exception):
+    pass
+
+
+class MineProbability():
+    """
+    Exact mine probabilities for the unknown cells of a Minesweeper board
+    """
+
+    def __init__(self, limit=200000, cache_size=4096):
+
+        # Most search nodes to visit when enumerating a single component
+        self.limit = limit
+
+        # Enumeration results, keyed by the constraints of a component
+        self.cache = dict()
+        self.cache_size = cache_size
+
+    def probabilities(self, constraints, unknown, mines_left):
+        """
+        Returns a dictionary mapping each cell in `unknown` to the
+        probability that it is a mine.
+
+        `constraints` is an iterable of (cells, count) pairs, each saying
+        that exactly `count` of `cells` are mines, and `mines_left` is the
+        number of mines not yet identified. Every board consistent with
+        the constraints and the mine count is taken as equally likely.
+        """
+        frontier, other = self.frontier_probabilities(
+            constraints, len(unknown), mines_left
+        )
+        return {cell: frontier.get(cell, other) for cell in unknown}
+
+    def frontier_probabilities(self, constraints, unknown, mines_left):
+        """
+        Returns a pair (frontier, other), where `frontier` maps every
+        cell in a constraint to its probability of being a mine, and
+        `other` is the probability for each of the remaining cells out
+        of `unknown` unknown cells in total.
+        """
+        constraints = frozenset(
+            (frozenset(cells), count) for cells, count in constraints if cells
+        )
+        frontier = set()
+        for cells, _ in constraints:
+            frontier |= cells
+        others = unknown - len(frontier)
+
+        try:
+            tallies = [
+                self.enumerate(group) for group in components(constraints)
+            ]
+        except TooManyConfigurations:
+            return estimate(constraints, unknown, mines_left)
+
+        # Weight frontier configurations with k mines by the number of ways
+        # to place the remaining mines among the other unknown cells. The
+        # binomials are huge on large boards, so each is taken relative to
+        # the largest one, through logarithms.
+        size = sum(len(totals) - 1 for totals, _ in tallies) + 1
+        logs = [log_comb(others, mines_left - k) for k in range(size)]
+        top = max(logs)
+        if top == -math.inf:
+            return estimate(constraints, unknown, mines_left)
+        ways = [math.exp(value - top) for value in logs]
+
+        # Scale each component's counts by its largest total, which cancels
+        # out, so that products over many components stay within floats
+        tallies = [scaled(totals, hits) for totals, hits in tallies]
+        totals = [totals for totals, _ in tallies]
+        combined = convolve_all(totals)
+        normalizer = sum(count * ways[k] for k, count in enumerate(combined))
+        if normalizer == 0:
+            return estimate(constraints, unknown, mines_left)
+
+        result = dict()
+        for i, (own, hits) in enumerate(tallies):
+            rest = convolve_all(totals[:i] + totals[i + 1:])
+            weight = [
+                sum(count * ways[k + j] for j, count in enumerate(rest))
+                for k in range(len(own))
+            ]
+            for cell, counts in hits.items():
+                result[cell] = sum(
+                    count * weight[k] for k, count in enumerate(counts)
+                ) / normalizer
+
+        other = 0
+        if others:
+            other = sum(
+                count * ways[k] * (mines_left - k)
+                for k, count in enumerate(combined)
+            ) / normalizer / others
+        return result, other
+
+    def safest(self, constraints, unknown, mines_left):
+        """
+        Returns the unknown cell least likely to be a mine, choosing
+        randomly among equally safe cells, or None if there is none.
+
+        `unknown` should be a sequence, so that a cell outside every
+        constraint can be drawn without building the full list of them.
+        """
+        if not isinstance(unknown, collections.abc.Sequence):
+            unknown = list(unknown)
+        if not unknown:
+            return None
+        frontier, other = self.frontier_probabilities(
+            constraints, len(unknown), mines_left
+        )
+        others = len(unknown) - len(frontier)
+        lowest = min(frontier.values(), default=1)
+        if others:
+            lowest = min(lowest, other)
+
+        ties = sorted(
+            cell for cell, probability in frontier.items()
+            if probability <= lowest + 1e-12
+        )
+        if others and other <= lowest + 1e-12:
+            pick = random.randrange(len(ties) + others)
+            if pick >= len(ties):
+                while True:
+                    cell = random.choice(unknown)
+                    if cell not in frontier:
+                        return cell
+            return ties[pick]
+        return random.choice(ties)
+
+    def enumerate(self, constraints):
+        """
+        Enumerates the mine configurations of a connected component.
+
+        Returns a pair (totals, hits), where totals[k] is the number of
+        configurations with k mines and hits[cell][k] is the number of
+        those in which `cell` is a mine.
+        """
+        if constraints in self.cache:
+            return self.cache[constraints]
+
+        constraints_list = list(constraints)
+        cells = order(constraints_list)
+        position = {cell: i for i, cell in enumerate(cells)}
+        containing = [[] for _ in cells]
+        need = []
+        free = []
+        for c, (group, count) in enumerate(constraints_list):
+            need.append(count)
+            free.append(len(group))
+            for cell in group:
+                containing[position[cell]].append(c)
+
+        totals = [0] * (len(cells) + 1)
+        hits = {cell: [0] * (len(cells) + 1) for cell in cells}
+
+        # Depth-first search over cells in order, with an explicit stack:
+        # assignment[i] is the value cell i holds, or None, and
+        # untried[i] the next value to try for it
+        assignment = [None] * len(cells)
+        untried = [0] * len(cells)
+        visited = 0
+        mines = 0
+        i = 0
+        while i >= 0:
+            if i == len(cells):
+                totals[mines] += 1
+                for j, value in enumerate(assignment):
+                    if value:
+                        hits[cells[j]][mines] += 1
+                i -= 1
+                continue
+
+            # Undo the value tried last for this cell, if any
+            value = assignment[i]
+            if value is not None:
+                for c in containing[i]:
+                    free[c] += 1
+                    need[c] += value
+                mines -= value
+                assignment[i] = None
+
+            value = untried[i]
+            if value > 1:
+                untried[i] = 0
+                i -= 1
+                continue
+            untried[i] = value + 1
+
+            visited += 1
+            if visited > self.limit:
+                raise TooManyConfigurations
+            consistent = True
+            for c in containing[i]:
+                free[c] -= 1
+                need[c] -= value
+                if need[c] < 0 or need[c] > free[c]:
+                    consistent = False
+            assignment[i] = value
+            mines += value
+            if consistent:
+                i += 1
+
+        if len(self.cache) >= self.cache_size:
+            self.cache.clear()
+        self.cache[constraints] = (totals, hits)
+        return totals, hits
+
+
+def components(constraints):
+    """
+    Splits (cells, count) constraints into groups that share no cells.
+    Returns a list of frozensets of constraints.
+    """
+    by_cell = dict()
+    for constraint in constraints:
+        for cell in constraint[0]:
+            by_cell.setdefault(cell, []).append(constraint)
+
+    groups = []
+    seen = set()
+    for constraint in constraints:
+        if constraint in seen:
+            continue
+        seen.add(constraint)
+        group = []
+        stack = [constraint]
+        while stack:
+            current = stack.pop()
+            group.append(current)
+            for cell in current[0]:
+                for other in by_cell[cell]:
+                    if other not in seen:
+                        seen.add(other)
+                        stack.append(other)
+        groups.append(frozenset(group))
+    return groups
+
+
+def order(constraints):
+    """
+    Orders the cells of a component breadth-first along its constraints,
+    so that cells sharing a constraint are assigned close together and
+    the search can prune early.
+    """
+    by_cell = dict()
+    for constraint in constraints:
+        for cell in constraint[0]:
+            by_cell.setdefault(cell, []).append(constraint)
+
+    cells = []
+    placed = set()
+    queue = [min(constraints, key=lambda c: (len(c[0]), sorted(c[0])))]
+    queued = set(queue)
+    for constraint in queue:
+        for cell in sorted(constraint[0]):
+            if cell in placed:
+                continue
+            placed.add(cell)
+            cells.append(cell)
+            for other in by_cell[cell]:
+                if other not in queued:
+                    queued.add(other)
+                    queue.append(other)
+    return cells
+
+
+def log_comb(n, k):
+    """Returns the natural logarithm of n choose k, or -inf if it is 0."""
+    if k < 0 or k > n:
+        return -math.inf
+    return math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1)
+
+
+def scaled(totals, hits):
+    """
+    Returns the counts of `MineProbability.enumerate` as floats, divided
+    by the largest total.
+    """
+    largest = max(totals) or 1
+    return (
+        [count / largest for count in totals],
+        {cell: [count / largest for count in counts]
+         for cell, counts in hits.items()},
+    )
+
+
+def convolve(a, b):
+    """Returns the convolution of two lists of counts."""
+    result = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                result[i + j] += x * y
+    return result
+
+
+def convolve_all(lists):
+    result = [1]
+    for counts in lists:
+        result = convolve(result, counts)
+    return result
+
+
+def estimate(constraints, unknown, mines_left):
+    """
+    Returns rough probabilities in the form of `frontier_probabilities`,
+    used when exact enumeration is too expensive: the highest density of
+    any constraint on a frontier cell, and the overall density elsewhere.
+    """
+    local = dict()
+    for cells, count in constraints:
+        for cell in cells:
+            local[cell] = max(local.get(cell, 0), count / len(cells))
+    return local, mines_left / unknown if unknown else 0
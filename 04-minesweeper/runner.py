@@ -1,18 +1,69 @@
+import logging
 import pygame
+import queue
 import sys
+import threading
 import time
 
 from minesweeper import Minesweeper, MinesweeperAI
 
-HEIGHT = 8
-WIDTH = 8
-MINES = 8
+# Board size and mine count, optionally given on the command line
+HEIGHT, WIDTH, MINES = 8, 8, 8
+if len(sys.argv) == 4:
+    HEIGHT, WIDTH, MINES = (int(arg) for arg in sys.argv[1:])
+elif len(sys.argv) != 1:
+    sys.exit("Usage: python runner.py [height width mines]")
+if not 0 <= MINES < HEIGHT * WIDTH:
+    sys.exit("Number of mines must be less than the number of cells")
 
 # Colors
 BLACK = (0, 0, 0)
 GRAY = (180, 180, 180)
 WHITE = (255, 255, 255)
 
+# Shades for revealed cells too small to show a number, by mine count
+SHADES = [(230 - 22 * count,) * 3 for count in range(9)]
+
+# Show the AI's moves on the terminal
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+
+class AIWorker(threading.Thread):
+    """
+    Runs the AI on a background thread, so that inference never blocks
+    drawing. The AI is only ever touched by this thread: the game sends
+    it requests on `inbox`, and reads its chosen moves from `outbox`.
+    """
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.inbox = queue.Queue()
+        self.outbox = queue.Queue()
+        self.ai = None
+        self.game_id = None
+
+    def run(self):
+        while True:
+            message = self.inbox.get()
+            kind, game_id = message[0], message[1]
+            if kind == "reset":
+                height, width, mines = message[2:]
+                self.ai = MinesweeperAI(
+                    height=height, width=width, mines=mines
+                )
+                self.game_id = game_id
+            elif game_id != self.game_id:
+                continue
+            elif kind == "knowledge":
+                self.ai.add_knowledge_batch(message[2])
+            elif kind == "move":
+                move = self.ai.make_safe_move()
+                safe = move is not None
+                if move is None:
+                    move = self.ai.make_random_move()
+                self.outbox.put((game_id, move, safe, self.ai.mines.copy()))
+
+
 # Create game
 pygame.init()
 size = width, height = 600, 400
@@ -28,8 +79,9 @@ largeFont = pygame.font.Font(OPEN_SANS, 40)
 BOARD_PADDING = 20
 board_width = ((2 / 3) * width) - (BOARD_PADDING * 2)
 board_height = height - (BOARD_PADDING * 2)
-cell_size = int(min(board_width / WIDTH, board_height / HEIGHT))
+cell_size = max(1, int(min(board_width / WIDTH, board_height / HEIGHT)))
 board_origin = (BOARD_PADDING, BOARD_PADDING)
+border = 3 if cell_size >= 20 else 1 if cell_size >= 4 else 0
 
 # Add images
 flag = pygame.image.load("assets/images/flag.png")
@@ -37,15 +89,82 @@ flag = pygame.transform.scale(flag, (cell_size, cell_size))
 mine = pygame.image.load("assets/images/mine.png")
 mine = pygame.transform.scale(mine, (cell_size, cell_size))
 
+# Render each neighbour count once, if cells are big enough to read it
+numbers = None
+if cell_size >= 12:
+    numberFont = pygame.font.Font(OPEN_SANS, min(20, cell_size - 4))
+    numbers = [
+        numberFont.render(str(count), True, BLACK) for count in range(9)
+    ]
+
+# Start the AI worker
+worker = AIWorker()
+worker.start()
+
+
+def new_game(game_id):
+    """Creates a game, and resets the AI worker to match it."""
+    worker.inbox.put(("reset", game_id, HEIGHT, WIDTH, MINES))
+    return Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
+
+
+def cell_rect(cell):
+    i, j = cell
+    return pygame.Rect(
+        board_origin[0] + j * cell_size,
+        board_origin[1] + i * cell_size,
+        cell_size, cell_size
+    )
+
+
+def cell_at(position):
+    """Returns the board cell under a screen position, or None."""
+    j = (position[0] - board_origin[0]) // cell_size
+    i = (position[1] - board_origin[1]) // cell_size
+    if 0 <= i < HEIGHT and 0 <= j < WIDTH:
+        return (i, j)
+    return None
+
+
+def draw_cell(cell):
+    """Draws one cell, and returns the screen area it covers."""
+    rect = cell_rect(cell)
+    if cell in revealed and numbers is None:
+        pygame.draw.rect(screen, SHADES[game.nearby_mines(cell)], rect)
+    else:
+        pygame.draw.rect(screen, GRAY, rect)
+    if border:
+        pygame.draw.rect(screen, WHITE, rect, border)
+
+    # Add a mine, flag, or number if needed
+    if lost and game.is_mine(cell):
+        screen.blit(mine, rect)
+    elif cell in flags:
+        screen.blit(flag, rect)
+    elif cell in revealed and numbers is not None:
+        neighbors = numbers[game.nearby_mines(cell)]
+        neighborsTextRect = neighbors.get_rect()
+        neighborsTextRect.center = rect.center
+        screen.blit(neighbors, neighborsTextRect)
+    return rect
+
+
 # Create game and AI agent
-game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
-ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
+game_id = 0
+game = new_game(game_id)
 
 # Keep track of revealed cells, flagged cells, and if a mine was hit
 revealed = set()
 flags = set()
 lost = False
 
+# Cells to redraw on the next frame, and whether the whole screen is stale
+dirty = set()
+redraw_all = True
+
+# Whether an AI move has been requested and not yet received
+thinking = False
+
 # Show instructions initially
 instructions = True
 
@@ -56,10 +175,9 @@ while True:
         if event.type == pygame.QUIT:
             sys.exit()
 
-    screen.fill(BLACK)
-
     # Show game instructions
     if instructions:
+        screen.fill(BLACK)
 
         # Title
         title = largeFont.render("Play Minesweeper", True, WHITE)
@@ -93,130 +211,121 @@ while True:
             mouse = pygame.mouse.get_pos()
             if buttonRect.collidepoint(mouse):
                 instructions = False
+                redraw_all = True
                 time.sleep(0.3)
 
         pygame.display.flip()
         continue
 
-    # Draw board
-    cells = []
-    for i in range(HEIGHT):
-        row = []
-        for j in range(WIDTH):
-
-            # Draw rectangle for cell
-            rect = pygame.Rect(
-                board_origin[0] + j * cell_size,
-                board_origin[1] + i * cell_size,
-                cell_size, cell_size
-            )
-            pygame.draw.rect(screen, GRAY, rect)
-            pygame.draw.rect(screen, WHITE, rect, 3)
-
-            # Add a mine, flag, or number if needed
-            if game.is_mine((i, j)) and lost:
-                screen.blit(mine, rect)
-            elif (i, j) in flags:
-                screen.blit(flag, rect)
-            elif (i, j) in revealed:
-                neighbors = smallFont.render(
-                    str(game.nearby_mines((i, j))),
-                    True, BLACK
-                )
-                neighborsTextRect = neighbors.get_rect()
-                neighborsTextRect.center = rect.center
-                screen.blit(neighbors, neighborsTextRect)
+    move = None
 
-            row.append(rect)
-        cells.append(row)
+    # Collect a move chosen by the AI, ignoring any from an earlier game
+    while not worker.outbox.empty():
+        result_id, result, safe, ai_mines = worker.outbox.get()
+        if result_id != game_id:
+            continue
+        thinking = False
+        if result is None:
+            dirty |= flags ^ ai_mines
+            flags = ai_mines
+            print("No moves left to make.")
+        elif safe:
+            print("AI making safe move.")
+            move = result
+        else:
+            print("No known safe moves, AI making random move.")
+            move = result
 
-    # AI Move button
+    # Side panel: AI Move button, Reset button and game status
+    panel = pygame.Rect((2 / 3) * width, 0, width / 3, height)
     aiButton = pygame.Rect(
         (2 / 3) * width + BOARD_PADDING, (1 / 3) * height - 50,
         (width / 3) - BOARD_PADDING * 2, 50
     )
-    buttonText = mediumFont.render("AI Move", True, BLACK)
-    buttonRect = buttonText.get_rect()
-    buttonRect.center = aiButton.center
-    pygame.draw.rect(screen, WHITE, aiButton)
-    screen.blit(buttonText, buttonRect)
-
-    # Reset button
     resetButton = pygame.Rect(
         (2 / 3) * width + BOARD_PADDING, (1 / 3) * height + 20,
         (width / 3) - BOARD_PADDING * 2, 50
     )
-    buttonText = mediumFont.render("Reset", True, BLACK)
-    buttonRect = buttonText.get_rect()
-    buttonRect.center = resetButton.center
-    pygame.draw.rect(screen, WHITE, resetButton)
-    screen.blit(buttonText, buttonRect)
-
-    # Display text
-    text = "Lost" if lost else "Won" if game.mines == flags else ""
-    text = mediumFont.render(text, True, WHITE)
-    textRect = text.get_rect()
-    textRect.center = ((5 / 6) * width, (2 / 3) * height)
-    screen.blit(text, textRect)
-
-    move = None
 
     left, _, right = pygame.mouse.get_pressed()
 
     # Check for a right-click to toggle flagging
     if right == 1 and not lost:
-        mouse = pygame.mouse.get_pos()
-        for i in range(HEIGHT):
-            for j in range(WIDTH):
-                if cells[i][j].collidepoint(mouse) and (i, j) not in revealed:
-                    if (i, j) in flags:
-                        flags.remove((i, j))
-                    else:
-                        flags.add((i, j))
-                    time.sleep(0.2)
+        cell = cell_at(pygame.mouse.get_pos())
+        if cell is not None and cell not in revealed:
+            if cell in flags:
+                flags.remove(cell)
+            else:
+                flags.add(cell)
+            dirty.add(cell)
+            time.sleep(0.2)
 
     elif left == 1:
         mouse = pygame.mouse.get_pos()
 
-        # If AI button clicked, make an AI move
+        # If AI button clicked, ask the worker for a move
         if aiButton.collidepoint(mouse) and not lost:
-            move = ai.make_safe_move()
-            if move is None:
-                move = ai.make_random_move()
-                if move is None:
-                    flags = ai.mines.copy()
-                    print("No moves left to make.")
-                else:
-                    print("No known safe moves, AI making random move.")
-            else:
-                print("AI making safe move.")
+            if not thinking:
+                thinking = True
+                worker.inbox.put(("move", game_id))
             time.sleep(0.2)
 
         # Reset game state
         elif resetButton.collidepoint(mouse):
-            game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
-            ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
+            game_id += 1
+            game = new_game(game_id)
             revealed = set()
             flags = set()
             lost = False
+            thinking = False
+            redraw_all = True
             continue
 
         # User-made move
         elif not lost:
-            for i in range(HEIGHT):
-                for j in range(WIDTH):
-                    if (cells[i][j].collidepoint(mouse)
-                            and (i, j) not in flags
-                            and (i, j) not in revealed):
-                        move = (i, j)
-
-    # Make move and update AI knowledge
+            cell = cell_at(mouse)
+            if (cell is not None
+                    and cell not in flags
+                    and cell not in revealed):
+                move = cell
+
+    # Make move and hand the revealed cells to the AI
     if move:
         if game.is_mine(move):
             lost = True
+            dirty |= game.mines
         else:
-            nearby = game.nearby_mines(move)
-            revealed.add(move)
-            ai.add_knowledge(move, nearby)
+            opened = game.reveal(move, revealed)
+            cells = [cell for cell, _ in opened]
+            revealed.update(cells)
+            dirty.update(cells)
+            worker.inbox.put(("knowledge", game_id, opened))
+
+    # Redraw the panel every frame, but only the board cells that changed
+    if redraw_all:
+        screen.fill(BLACK)
+        dirty = {(i, j) for i in range(HEIGHT) for j in range(WIDTH)}
+    pygame.draw.rect(screen, BLACK, panel)
+    for button, label in [(aiButton, "AI Move"), (resetButton, "Reset")]:
+        buttonText = mediumFont.render(label, True, BLACK)
+        buttonRect = buttonText.get_rect()
+        buttonRect.center = button.center
+        pygame.draw.rect(screen, WHITE, button)
+        screen.blit(buttonText, buttonRect)
 
-    pygame.display.flip()
+    # Display text
+    text = "Lost" if lost else "Won" if game.mines == flags else ""
+    if not text and thinking:
+        text = "Thinking..."
+    text = mediumFont.render(text, True, WHITE)
+    textRect = text.get_rect()
+    textRect.center = ((5 / 6) * width, (2 / 3) * height)
+    screen.blit(text, textRect)
+
+    areas = [draw_cell(cell) for cell in dirty]
+    if redraw_all:
+        pygame.display.flip()
+    else:
+        pygame.display.update(areas + [panel])
+    dirty = set()
+    redraw_all = False
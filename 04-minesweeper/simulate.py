@@ -0,0 +1,101 @@
+import multiprocessing
+import random
+import sys
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+# Standard board configurations as (height, width, mines)
+CONFIGURATIONS = {
+    "beginner": (9, 9, 10),
+    "intermediate": (16, 16, 40),
+    "expert": (16, 30, 99),
+}
+
+
+def play(height, width, mines, seed=None, deduction="linear"):
+    """
+    Plays one game of the AI against a random board, without a display.
+    Returns whether the AI won, and the time taken by each move in
+    seconds, from choosing the move to updating the AI's knowledge.
+    """
+    if seed is not None:
+        random.seed(seed)
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(
+        height=height, width=width, mines=mines, deduction=deduction
+    )
+    latencies = []
+    while True:
+        start = time.perf_counter()
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+        if move is None:
+            return ai.mines == game.mines, latencies
+        if game.is_mine(move):
+            return False, latencies
+        ai.add_knowledge_batch(game.reveal(move, ai.moves_made))
+        latencies.append(time.perf_counter() - start)
+
+
+def _play(args):
+    return play(*args)
+
+
+def simulate(games, height, width, mines, processes=None, seed=0,
+             deduction="linear"):
+    """
+    Plays `games` games across a pool of processes, game `i` on a board
+    drawn with seed `seed + i`.
+
+    Returns a dictionary with the number of games won, the wall time in
+    seconds, and the latency of every move made.
+    """
+    tasks = [
+        (height, width, mines, seed + i, deduction) for i in range(games)
+    ]
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.map(_play, tasks, chunksize=max(1, games // 64))
+    elapsed = time.perf_counter() - start
+    return {
+        "wins": sum(won for won, _ in results),
+        "seconds": elapsed,
+        "latencies": [latency for _, moves in results for latency in moves],
+    }
+
+
+def percentile(values, fraction):
+    """Returns the value at `fraction` of the way through sorted values."""
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def report(name, games, result):
+    """Prints a summary of the result of `simulate`."""
+    latencies = result["latencies"] or [0]
+    print(f"{name}: {games} games, "
+          f"win rate {100 * result['wins'] / games:.1f}%, "
+          f"{games / result['seconds']:.1f} games/s")
+    quantiles = ", ".join(
+        f"p{int(100 * fraction)} "
+        f"{1000 * percentile(latencies, fraction):.3f} ms"
+        for fraction in [0.5, 0.9, 0.99]
+    )
+    print(f"  move latency: {quantiles}, "
+          f"max {1000 * max(latencies):.3f} ms")
+
+
+def main():
+    if len(sys.argv) not in [1, 2, 3]:
+        sys.exit("Usage: python simulate.py [games] [processes]")
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    for name, (height, width, mines) in CONFIGURATIONS.items():
+        result = simulate(games, height, width, mines, processes)
+        report(name, games, result)
+
+
+if __name__ == "__main__":
+    main()
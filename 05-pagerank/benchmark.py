@@ -0,0 +1,324 @@
+import multiprocessing
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import crawler
+import generate
+import outofcore
+import pagerank
+import parallel
+import solvers
+import sparse
+import walkers
+from incremental import IncrementalPageRank
+
+
+def random_graph(n, degree=8, dangling=0.1, seed=0, local=0, host=50):
+    """
+    Returns a random sparse.Graph over n pages, where a `dangling`
+    fraction of pages have no links and every other page links to
+    about `degree` pages.
+
+    Pages are grouped into hosts of `host` consecutive pages, and a
+    `local` fraction of links stay within their page's host, as most
+    links on the web do. Other links go to pages chosen uniformly at
+    random. Local links slow power iteration down, as on real corpora.
+    """
+    rng = np.random.default_rng(seed)
+    linking = np.flatnonzero(rng.random(n) >= dangling)
+    counts = rng.poisson(degree, len(linking)) + 1
+    sources = np.repeat(linking, counts)
+    targets = rng.integers(0, n, len(sources))
+    inside = rng.random(len(sources)) < local
+    neighbours = sources - sources % host + rng.integers(0, host, len(sources))
+    targets[inside] = np.minimum(neighbours[inside], n - 1)
+    return sparse.Graph.from_edges(n, sources, targets)
+
+
+def corpus_of(graph):
+    """Returns a graph as a corpus dictionary, as `crawl` would."""
+    return {
+        str(i): {
+            str(j) for j in graph.indices[graph.indptr[i]:graph.indptr[i + 1]]
+        }
+        for i in range(graph.n)
+    }
+
+
+def timed(function, *args, **kwargs):
+    """Returns the result of a call along with its wall time in seconds."""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def compare(n):
+    """
+    Times `pagerank.iterate_pagerank` against `sparse.iterate_pagerank`
+    on a random corpus of n pages, and reports the largest difference.
+    """
+    corpus = corpus_of(random_graph(n))
+    original, original_time = timed(pagerank.iterate_pagerank,
+                                    corpus, pagerank.DAMPING)
+    fast, fast_time = timed(sparse.iterate_pagerank,
+                            corpus, pagerank.DAMPING)
+    error = max(abs(original[page] - fast[page]) for page in corpus)
+    print(f"{n:>9} {original_time:>9.3f}s {fast_time:>9.3f}s "
+          f"{original_time / fast_time:>8.1f}x {error:>10.2e}")
+
+
+def scaling(n, tolerance=sparse.TOLERANCE):
+    """Times building and solving a random graph of n pages."""
+    graph, build_time = timed(random_graph, n)
+    _, matrix_time = timed(graph.matrix)
+    (ranks, iterations), solve_time = timed(
+        sparse.power_iteration, graph, tolerance=tolerance
+    )
+    print(f"{n:>9} {len(graph.indices):>11} {build_time:>8.2f}s "
+          f"{matrix_time:>8.2f}s {solve_time:>8.2f}s {iterations:>6} "
+          f"{abs(ranks.sum() - 1):>10.2e}")
+
+
+def walking(n, walkers_count=100000, steps=200):
+    """
+    Times Monte Carlo PageRank on a random graph of n pages with 1 up to
+    one process per core, and reports its L1 error against the exact
+    ranks.
+    """
+    graph = random_graph(n)
+    exact, _ = sparse.power_iteration(graph)
+    samples = walkers_count * (steps + walkers.BURN_IN)
+    print(f"{n} pages, {walkers_count} walkers, {steps} steps each")
+    print(f"{'processes':>9} {'time':>9} {'Msteps/s':>9} {'L1 error':>9}")
+    processes = 1
+    while processes <= multiprocessing.cpu_count():
+        ranks, elapsed = timed(walkers.monte_carlo, graph, walkers_count,
+                               steps, processes=processes)
+        error = np.abs(ranks - exact).sum()
+        print(f"{processes:>9} {elapsed:>8.2f}s "
+              f"{samples / elapsed / 10 ** 6:>9.1f} {error:>9.4f}")
+        processes *= 2
+
+
+def updating(n, edits=10, rounds=5, seed=0):
+    """
+    Times IncrementalPageRank.update after `edits` random link changes
+    to a random graph of n pages, against rebuilding the graph and
+    solving it from uniform ranks.
+    """
+    rng = np.random.default_rng(seed)
+    incremental = IncrementalPageRank(random_graph(n))
+    print(f"{n} pages, {edits} link changes per round")
+    print(f"{'round':>5} {'update':>9} {'sweeps':>6} {'rebuild':>9} "
+          f"{'sweeps':>6} {'L1 difference':>13}")
+    for round in range(rounds):
+        for _ in range(edits):
+            page, link = rng.integers(0, n, 2).tolist()
+            if rng.random() < 0.5:
+                incremental.add_link(page, link)
+            else:
+                incremental.set_links(page, [])
+        iterations, update_time = timed(incremental.update)
+
+        def rebuild():
+            sources = []
+            targets = []
+            for page in range(n):
+                links = incremental.links(page)
+                sources.extend([page] * len(links))
+                targets.extend(links)
+            graph = sparse.Graph.from_edges(n, sources, targets)
+            return sparse.power_iteration(graph)
+
+        (ranks, full), rebuild_time = timed(rebuild)
+        error = np.abs(ranks - incremental.ranks).sum()
+        print(f"{round:>5} {update_time:>8.3f}s {iterations:>6} "
+              f"{rebuild_time:>8.3f}s {full:>6} {error:>13.2e}")
+
+
+def solving(n, error=1e-8):
+    """
+    Times every solver in `solvers.SOLVERS` on random graphs of n pages,
+    with and without host-local links, stopping each at a residual that
+    bounds its L1 error by `error`.
+    """
+    damping = sparse.DAMPING
+    tolerance = error * (1 - damping)
+    for local in [0, 0.9, 0.99]:
+        graph = random_graph(n, local=local)
+        exact, _ = sparse.power_iteration(graph, tolerance=1e-15,
+                                          max_iterations=10000)
+        print(f"{n} pages, {100 * local:.0f}% local links, "
+              f"L1 error {error} or less")
+        print(f"{'solver':>13} {'sweeps':>6} {'time':>9} {'L1 error':>9}")
+        for method in solvers.SOLVERS:
+            (ranks, iterations), elapsed = timed(
+                solvers.solve, graph, method, damping, tolerance
+            )
+            print(f"{method:>13} {iterations:>6} {elapsed:>8.3f}s "
+                  f"{np.abs(ranks - exact).sum():>9.2e}")
+
+
+def measured(function, *args):
+    """
+    Returns the result of a call, its wall time in seconds, and the peak
+    memory in bytes it allocated, from a second call under tracemalloc.
+    The second call is skipped, and the memory reported as None, for
+    calls slow enough that tracing would take too long.
+    """
+    result, elapsed = timed(function, *args)
+    if elapsed > 10:
+        return result, elapsed, None
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def vector(ranks, n):
+    """Returns ranks keyed by "i.html" as a vector indexed by page i."""
+    return np.array([ranks[f"{page}.html"] for page in range(n)])
+
+
+def out_of_core(graph):
+    with tempfile.TemporaryDirectory() as directory:
+        outofcore.write_graph(graph, directory)
+        return outofcore.pagerank(directory)[0]
+
+
+# Ranking engines benchmarked by `suite`, each called with the corpus
+# as crawled and the generated graph, and returning a rank vector
+ENGINES = {
+    "sample_pagerank": lambda corpus, graph: vector(
+        pagerank.sample_pagerank(corpus, pagerank.DAMPING, pagerank.SAMPLES),
+        graph.n
+    ),
+    "iterate_pagerank": lambda corpus, graph: vector(
+        pagerank.iterate_pagerank(corpus, pagerank.DAMPING), graph.n
+    ),
+    "sparse": lambda corpus, graph: sparse.power_iteration(graph)[0],
+    "quadratic": lambda corpus, graph: solvers.solve(graph, "quadratic")[0],
+    "walkers": lambda corpus, graph: walkers.monte_carlo(graph, 10000, 100),
+    "outofcore": lambda corpus, graph: out_of_core(graph),
+    "parallel": lambda corpus, graph: parallel.power_iteration(graph)[0],
+}
+
+
+def suite(largest, budget=60.0, seed=0):
+    """
+    Generates corpora of 10^2 pages up to `largest` pages, writes each
+    as HTML, and runs the crawlers and every engine in ENGINES on it,
+    reporting time, peak traced memory, and agreement: links found for
+    crawlers, and L1 distance from the exact ranks for engines.
+
+    An engine is dropped for larger corpora once it takes longer than
+    `budget` seconds.
+    """
+    slow = set()
+    print(f"{'pages':>9} {'engine':>16} {'time':>9} {'memory':>10} "
+          f"{'agreement':>12}")
+    n = 100
+    while n <= largest:
+        graph = generate.generate_graph(n, seed=seed)
+        exact, _ = sparse.power_iteration(graph, tolerance=1e-12)
+        with tempfile.TemporaryDirectory() as directory:
+            generate.write_corpus(graph, directory)
+            runs = [
+                ("crawl", pagerank.crawl, (directory,)),
+                ("crawler", crawler.crawl_graph, (directory,)),
+            ]
+            corpus = None
+            for name, function, args in runs:
+                if name in slow:
+                    continue
+                result, elapsed, peak = measured(function, *args)
+                if name == "crawl":
+                    corpus = result
+                    links = sum(len(links) for links in result.values())
+                else:
+                    links = len(result.indices)
+                report_run(n, name, elapsed, peak,
+                           f"{links}/{len(graph.indices)}")
+                if elapsed > budget:
+                    slow.add(name)
+
+        for name, engine in ENGINES.items():
+            if name in slow or (corpus is None and "pagerank" in name):
+                continue
+            ranks, elapsed, peak = measured(engine, corpus, graph)
+            report_run(n, name, elapsed, peak,
+                       f"{np.abs(ranks - exact).sum():.2e}")
+            if elapsed > budget:
+                slow.add(name)
+        n *= 10
+
+
+def report_run(n, name, elapsed, peak, agreement):
+    memory = "-" if peak is None else f"{peak / 2 ** 20:.1f} MiB"
+    print(f"{n:>9} {name:>16} {elapsed:>8.3f}s {memory:>10} "
+          f"{agreement:>12}")
+
+
+def parallelism(n, processes=None):
+    """
+    Times `parallel.power_iteration` with 1 up to `processes` worker
+    processes, one per core by default, on a random graph of n pages,
+    against the single-process `sparse.power_iteration`.
+    """
+    processes = processes or multiprocessing.cpu_count()
+    graph = random_graph(n, local=0.9)
+    graph.matrix()
+    (exact, sweeps), single = timed(sparse.power_iteration, graph)
+    print(f"{n} pages, {len(graph.indices)} links, {sweeps} sweeps, "
+          f"single process {single:.3f}s")
+    print(f"{'processes':>9} {'time':>9} {'speedup':>8} {'sweeps':>6} "
+          f"{'max difference':>14}")
+    for count in range(1, processes + 1):
+        (ranks, iterations), elapsed = timed(
+            parallel.power_iteration, graph, count
+        )
+        print(f"{count:>9} {elapsed:>8.3f}s {single / elapsed:>7.2f}x "
+              f"{iterations:>6} {np.abs(ranks - exact).max():>14.2e}")
+
+
+def iterating(pages):
+    """Benchmarks the sparse power iteration engine."""
+    print("Dense loop against sparse power iteration")
+    print(f"{'pages':>9} {'original':>10} {'sparse':>10} {'speedup':>9} "
+          f"{'max error':>10}")
+    for n in [100, 300, 1000]:
+        compare(n)
+
+    print(f"\nSparse power iteration to L1 change {sparse.TOLERANCE}")
+    print(f"{'pages':>9} {'links':>11} {'graph':>9} {'matrix':>9} "
+          f"{'solve':>9} {'sweeps':>6} {'|sum - 1|':>10}")
+    n = 10 ** 4
+    while n < pages:
+        scaling(n)
+        n *= 10
+    scaling(pages)
+
+
+def main():
+    modes = {
+        "iterate": (iterating, 10 ** 6),
+        "walk": (walking, 10 ** 5),
+        "update": (updating, 10 ** 6),
+        "solve": (solving, 10 ** 6),
+        "suite": (suite, 10 ** 5),
+        "parallel": (parallelism, 10 ** 6),
+    }
+    if len(sys.argv) not in [2, 3] or sys.argv[1] not in modes:
+        sys.exit("Usage: python benchmark.py "
+                 "iterate|walk|update|solve|suite|parallel [pages]")
+    mode, pages = modes[sys.argv[1]]
+    mode(int(sys.argv[2]) if len(sys.argv) == 3 else pages)
+
+
+if __name__ == "__main__":
+    main()
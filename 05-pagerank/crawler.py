@@ -0,0 +1,144 @@
+import array
+import multiprocessing
+import os
+import re
+
+from sparse import Graph
+
+# Bytes read from a page at a time
+CHUNK_SIZE = 1 << 20
+
+# Links sent on at a time by `crawl_edges`
+BLOCK = 1 << 20
+
+# Longest unfinished link tag carried over from one chunk to the next
+MAX_TAG = 1 << 12
+
+# The link pattern used by `pagerank.crawl`
+LINK = re.compile(rb"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
+# Text that a match of LINK could still grow from, once more is read
+PARTIAL = re.compile(
+    rb"<(?:a(?:\s+[^>]*?(?:h(?:r(?:e(?:f(?:=(?:\"[^\"]*)?)?)?)?)?)?)?)?"
+)
+
+
+def links(path, chunk_size=CHUNK_SIZE):
+    """
+    Returns the set of link targets in an HTML file, found with the same
+    pattern as `pagerank.crawl` but reading the file in chunks.
+
+    A link tag cut off at the end of a chunk is carried over and matched
+    again with the next chunk, so chunk boundaries change nothing as
+    long as the unfinished tag is at most MAX_TAG bytes long.
+    """
+    found = set()
+    carry = b""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            text = carry + chunk if carry else chunk
+            end = 0
+            for match in LINK.finditer(text):
+                found.add(match.group(1))
+                end = match.end()
+            if len(chunk) < chunk_size:
+                break
+
+            # Keep the first tag that has not failed yet, if any
+            carry = b""
+            start = text.find(b"<", max(end, len(text) - MAX_TAG))
+            while start != -1:
+                if PARTIAL.fullmatch(text, start):
+                    carry = text[start:]
+                    break
+                start = text.find(b"<", start + 1)
+    return {os.fsdecode(link) for link in found}
+
+
+def _links(args):
+    filename, path, chunk_size = args
+    return filename, links(path, chunk_size) - {filename}
+
+
+def crawl_edges(directory, processes=None, chunk_size=CHUNK_SIZE,
+                block_size=BLOCK):
+    """
+    Parses a directory of HTML pages with a pool of `processes` worker
+    processes, one per core by default, and returns a tuple (pages,
+    blocks), where pages are the sorted file names and blocks yields the
+    links between them as (sources, targets) integer arrays of about
+    `block_size` links each, as `outofcore.write_edges` takes them. With
+    a single process the pages are parsed in this process.
+
+    Workers send back each page's links as they finish, and the links
+    are written straight into integer edge arrays, so only the map from
+    page names to numbers and one block of links are kept in memory.
+    """
+    with os.scandir(directory) as entries:
+        files = sorted(
+            (entry.name, entry.path) for entry in entries
+            if entry.name.endswith(".html")
+        )
+    pages = [filename for filename, _ in files]
+    number = {page: i for i, page in enumerate(pages)}
+    tasks = [(filename, path, chunk_size) for filename, path in files]
+
+    def add(results):
+        sources = array.array("q")
+        targets = array.array("q")
+        for filename, found in results:
+            source = number[filename]
+            for link in found:
+                target = number.get(link)
+                if target is not None:
+                    sources.append(source)
+                    targets.append(target)
+            if len(sources) >= block_size:
+                yield sources, targets
+                sources = array.array("q")
+                targets = array.array("q")
+        if sources:
+            yield sources, targets
+
+    def blocks():
+        count = processes or os.cpu_count() or 1
+        if count == 1:
+            yield from add(map(_links, tasks))
+        else:
+            with multiprocessing.Pool(count) as pool:
+                chunksize = max(1, len(tasks) // (64 * count))
+                yield from add(pool.imap_unordered(_links, tasks, chunksize))
+
+    return pages, blocks()
+
+
+def crawl_graph(directory, processes=None, chunk_size=CHUNK_SIZE):
+    """
+    Parses a directory of HTML pages with `crawl_edges` and returns the
+    links between them as a sparse.Graph whose pages are the sorted file
+    names.
+    """
+    pages, blocks = crawl_edges(directory, processes, chunk_size)
+    sources = array.array("q")
+    targets = array.array("q")
+    for block_sources, block_targets in blocks:
+        sources.extend(block_sources)
+        targets.extend(block_targets)
+    return Graph.from_edges(len(pages), sources, targets, pages)
+
+
+def crawl(directory, processes=None):
+    """
+    Return a dictionary where each key is a page, and values are a set of
+    all other pages in the corpus that are linked to by the page, with
+    the same interface as `pagerank.crawl`.
+    """
+    graph = crawl_graph(directory, processes)
+    return {
+        page: {
+            graph.pages[j]
+            for j in graph.indices[graph.indptr[i]:graph.indptr[i + 1]]
+        }
+        for i, page in enumerate(graph.pages)
+    }
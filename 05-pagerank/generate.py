@@ -0,0 +1,147 @@
+import os
+import sys
+
+import numpy as np
+
+from outofcore import write_graph
+from sparse import Graph
+
+# Share of links that go to a uniformly chosen page rather than copying
+# an earlier link's target
+UNIFORM = 0.3
+
+# Exponent of the power law followed by the number of links per page
+EXPONENT = 2.1
+
+# Most links on any one page
+MAX_LINKS = 1000
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+    <head>
+        <title>{name}</title>
+    </head>
+    <body>
+        <h1>{name}</h1>
+
+        <div>Links:</div>
+        <ul>
+{links}
+        </ul>
+    </body>
+</html>
+"""
+
+LINK = '            <li><a href="{target}.html">{target}</a></li>'
+
+
+def mean_links(smallest, cap):
+    """
+    Returns the mean of the link counts drawn by `out_degrees` from a
+    power law starting at `smallest`, once rounded down and clipped to
+    between 1 and `cap`, as the sum over k of the chance of k or more.
+    """
+    k = np.arange(2, cap + 1)
+    return 1 + np.minimum(1, (smallest / k) ** (EXPONENT - 1)).sum()
+
+
+def out_degrees(n, degree, dangling, rng):
+    """
+    Returns the number of links from each of n pages: a `dangling`
+    fraction have none, and the rest follow a discrete power law with
+    exponent EXPONENT, capped at MAX_LINKS, that averages `degree`.
+
+    Rounding down and clipping change the mean of the continuous power
+    law a lot when `degree` is small, so its smallest value is found by
+    bisection on the mean of the discrete, clipped one.
+    """
+    cap = max(1, min(MAX_LINKS, n - 1))
+    low, high = 0.0, float(cap)
+    for _ in range(60):
+        middle = (low + high) / 2
+        if mean_links(middle, cap) < degree:
+            low = middle
+        else:
+            high = middle
+    counts = np.floor(
+        high * (1 - rng.random(n)) ** (-1 / (EXPONENT - 1))
+    ).astype(np.int64)
+    counts = np.clip(counts, 1, cap)
+    counts[rng.random(n) < dangling] = 0
+    return counts
+
+
+def preferential_edges(n, degree=8, dangling=0.1, seed=0):
+    """
+    Returns arrays (sources, targets) of random links between n pages,
+    with out-degrees from `out_degrees` and in-degrees following a power
+    law by preferential attachment.
+
+    Links are made in order, and each one either goes to a uniformly
+    chosen page, with probability UNIFORM, or copies the target of a
+    uniformly chosen earlier link, so that pages are linked to in
+    proportion to how often they already are. Chains of copies are
+    resolved by pointer jumping, in a logarithmic number of passes.
+    """
+    rng = np.random.default_rng(seed)
+    sources = np.repeat(np.arange(n), out_degrees(n, degree, dangling, rng))
+    rng.shuffle(sources)
+    count = len(sources)
+
+    # Each link points to itself if it is resolved, or to the earlier
+    # link whose target it copies
+    targets = rng.integers(0, n, count)
+    parent = np.arange(count)
+    copies = np.flatnonzero(rng.random(count) >= UNIFORM)
+    copies = copies[copies > 0]
+    parent[copies] = (rng.random(len(copies)) * copies).astype(np.int64)
+    while True:
+        grandparent = parent[parent]
+        if np.array_equal(grandparent, parent):
+            break
+        parent = grandparent
+    return sources, targets[parent]
+
+
+def generate_graph(n, degree=8, dangling=0.1, seed=0):
+    """
+    Returns a sparse.Graph of a random corpus of n pages named "0" to
+    str(n - 1), linked by `preferential_edges`.
+    """
+    sources, targets = preferential_edges(n, degree, dangling, seed)
+    return Graph.from_edges(
+        n, sources, targets, [str(page) for page in range(n)]
+    )
+
+
+def write_corpus(graph, directory):
+    """Writes a sparse.Graph as a directory of HTML pages for `crawl`."""
+    os.makedirs(directory, exist_ok=True)
+    for page in range(graph.n):
+        start, end = graph.indptr[page], graph.indptr[page + 1]
+        links = "\n".join(
+            LINK.format(target=target)
+            for target in graph.indices[start:end].tolist()
+        )
+        path = os.path.join(directory, f"{page}.html")
+        with open(path, "w") as f:
+            f.write(PAGE.format(name=page, links=links))
+
+
+def main():
+    kinds = ["html", "edges"]
+    if len(sys.argv) not in [4, 5, 6] or sys.argv[1] not in kinds:
+        sys.exit("Usage: python generate.py html|edges directory pages "
+                 "[degree] [dangling]")
+    kind, directory, n = sys.argv[1], sys.argv[2], int(sys.argv[3])
+    degree = float(sys.argv[4]) if len(sys.argv) > 4 else 8
+    dangling = float(sys.argv[5]) if len(sys.argv) > 5 else 0.1
+    graph = generate_graph(n, degree, dangling)
+    if kind == "html":
+        write_corpus(graph, directory)
+    else:
+        write_graph(graph, directory)
+
+
+if __name__ == "__main__":
+    main()
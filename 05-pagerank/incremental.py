@@ -0,0 +1,150 @@
+import numpy as np
+import scipy.sparse
+
+from sparse import DAMPING, TOLERANCE, Graph, power_iteration
+
+# Fraction of pages that may be edited before the snapshot is rebuilt
+COMPACT = 0.01
+
+
+class IncrementalPageRank():
+    """
+    Keeps the PageRank of a corpus up to date as pages are added and
+    their links change, without crawling or recomputing from scratch.
+
+    The last graph snapshot is kept in CSR form, and the links of pages
+    edited since are kept separately as sets. `update` multiplies by the
+    snapshot's matrix with the edited pages' columns replaced, and
+    restarts power iteration from the previous ranks, which are already
+    close to the new ones after a small edit.
+    """
+
+    def __init__(self, graph, damping=DAMPING, tolerance=TOLERANCE):
+        self.damping = damping
+        self.tolerance = tolerance
+        self.snapshot = graph
+        self.pages = list(graph.pages or range(graph.n))
+        self.number = {page: i for i, page in enumerate(self.pages)}
+
+        # Current links of every page edited or added since the snapshot
+        self.edited = dict()
+
+        self.ranks, self.iterations = power_iteration(
+            graph, damping, tolerance
+        )
+
+    @classmethod
+    def from_corpus(cls, corpus, damping=DAMPING, tolerance=TOLERANCE):
+        return cls(Graph.from_corpus(corpus), damping, tolerance)
+
+    def links(self, page):
+        """Returns the set of page numbers linked to by page number `page`."""
+        if page in self.edited:
+            return self.edited[page]
+        start, end = self.snapshot.indptr[page:page + 2]
+        return set(self.snapshot.indices[start:end].tolist())
+
+    def add_page(self, page, links=()):
+        """Adds a new page to the corpus, linking to existing `links`."""
+        if page in self.number:
+            raise ValueError(f"{page} is already in the corpus")
+        self.number[page] = len(self.pages)
+        self.pages.append(page)
+        self.set_links(page, links)
+
+    def set_links(self, page, links):
+        """Replaces the links of a page, as when the page is edited."""
+        source = self.number[page]
+        links = {self.number[link] for link in links}
+        self.edited[source] = links - {source}
+
+    def add_link(self, page, link):
+        source = self.number[page]
+        if self.number[link] != source:
+            self.edited[source] = self.links(source) | {self.number[link]}
+
+    def remove_link(self, page, link):
+        source = self.number[page]
+        self.edited[source] = self.links(source) - {self.number[link]}
+
+    def update(self):
+        """
+        Brings the ranks up to date with every edit made since the last
+        update, and returns the number of sweeps it took.
+        """
+        if not self.edited:
+            return 0
+        if len(self.edited) > COMPACT * len(self.pages):
+            self.compact()
+
+        # Start new pages at the uniform rank, and rescale to sum to 1
+        n = len(self.pages)
+        start = np.full(n, 1 / n)
+        start[:len(self.ranks)] = self.ranks
+        start /= start.sum()
+
+        self.ranks, self.iterations = power_iteration(
+            _Edited(self.snapshot, self.edited, n),
+            self.damping, self.tolerance, start=start
+        )
+        return self.iterations
+
+    def compact(self):
+        """Folds every edit into a new CSR snapshot."""
+        sources = []
+        targets = []
+        for page in range(len(self.pages)):
+            links = self.links(page)
+            sources.extend([page] * len(links))
+            targets.extend(links)
+        self.snapshot = Graph.from_edges(
+            len(self.pages), sources, targets, list(self.pages)
+        )
+        self.edited = dict()
+
+    def pagerank(self):
+        """Returns a dictionary mapping each page to its current rank."""
+        return dict(zip(self.pages, self.ranks.tolist()))
+
+
+class _Edited():
+    """
+    A graph snapshot with the links of some pages replaced, and new pages
+    appended, with the attributes that `sparse.step` uses.
+    """
+
+    def __init__(self, snapshot, edited, n):
+        self.n = n
+        self.snapshot = snapshot
+
+        # Edited pages drop out of the snapshot's matrix ...
+        self.keep = np.ones(snapshot.n)
+        old = [page for page in edited if page < snapshot.n]
+        self.keep[old] = 0
+
+        # ... and their new columns are a small matrix of their own
+        sources = []
+        targets = []
+        weights = []
+        for page, links in edited.items():
+            for link in links:
+                sources.append(page)
+                targets.append(link)
+                weights.append(1 / len(links))
+        self.patch = scipy.sparse.csr_matrix(
+            (weights, (targets, sources)), shape=(n, n)
+        )
+
+        self.dangling = np.zeros(n, dtype=bool)
+        self.dangling[:snapshot.n] = snapshot.dangling
+        for page, links in edited.items():
+            self.dangling[page] = not links
+
+    def matrix(self):
+        return self
+
+    def __matmul__(self, ranks):
+        base = self.snapshot.n
+        result = self.patch @ ranks
+        result[:base] += self.snapshot.matrix() @ (ranks[:base] * self.keep)
+        return result
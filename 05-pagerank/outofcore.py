@@ -0,0 +1,128 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from crawler import crawl_edges
+from sparse import DAMPING, MAX_ITERATIONS, TOLERANCE
+
+# Links read from disk at a time
+BLOCK = 1 << 22
+
+# A link as stored on disk
+EDGE = np.dtype([("source", "<i8"), ("target", "<i8")])
+
+
+def write_edges(directory, n, blocks, block_size=BLOCK):
+    """
+    Writes the links between n pages to `directory` for `pagerank`, given
+    an iterable of (sources, targets) array pairs in any order. Links are
+    assumed distinct, as `crawl` produces them; self-links are dropped.
+
+    Writes edges.npy, every link sorted by source, and outdegree.npy,
+    the number of links from each page. Links are first spilled to disk
+    unsorted while counting each page's links, then moved to their place
+    by a counting sort, so at most one block of links is in memory.
+    """
+    os.makedirs(directory, exist_ok=True)
+    outdegree = np.zeros(n, dtype=np.int64)
+    with tempfile.TemporaryFile(dir=directory) as spill:
+        for sources, targets in blocks:
+            sources = np.asarray(sources, dtype=np.int64)
+            targets = np.asarray(targets, dtype=np.int64)
+            keep = sources != targets
+            block = np.empty(np.count_nonzero(keep), dtype=EDGE)
+            block["source"] = sources[keep]
+            block["target"] = targets[keep]
+            outdegree += np.bincount(block["source"], minlength=n)
+            spill.write(block.tobytes())
+
+        # Each page's links start where the previous page's links end
+        position = np.zeros(n, dtype=np.int64)
+        np.cumsum(outdegree[:-1], out=position[1:])
+        edges = np.lib.format.open_memmap(
+            os.path.join(directory, "edges.npy"), mode="w+",
+            dtype=EDGE, shape=(int(outdegree.sum()),)
+        )
+        spill.seek(0)
+        while True:
+            block = np.frombuffer(
+                spill.read(block_size * EDGE.itemsize), dtype=EDGE
+            )
+            if not len(block):
+                break
+            block = block[np.argsort(block["source"], kind="stable")]
+            pages, first, counts = np.unique(
+                block["source"], return_index=True, return_counts=True
+            )
+            within = np.arange(len(block)) - np.repeat(first, counts)
+            edges[position[block["source"]] + within] = block
+            position[pages] += counts
+        edges.flush()
+        del edges
+    np.save(os.path.join(directory, "outdegree.npy"), outdegree)
+
+
+def write_graph(graph, directory, block_size=BLOCK):
+    """Writes a sparse.Graph to `directory` for `pagerank`."""
+    def blocks():
+        for start in range(0, len(graph.indices), block_size):
+            end = min(start + block_size, len(graph.indices))
+            sources = np.searchsorted(
+                graph.indptr, np.arange(start, end), side="right"
+            ) - 1
+            yield sources, graph.indices[start:end]
+    write_edges(directory, graph.n, blocks(), block_size)
+
+
+def pagerank(directory, damping=DAMPING, tolerance=TOLERANCE,
+             max_iterations=MAX_ITERATIONS, block_size=BLOCK):
+    """
+    Returns the PageRank vector of the links written to `directory` by
+    `write_edges`, by power iteration to an L1 change of `tolerance`.
+
+    The links are memory-mapped, and every sweep streams through them a
+    block at a time, so only vectors with one entry per page stay in
+    memory. Pages with no links spread their rank over every page.
+
+    Returns a tuple (ranks, iterations).
+    """
+    edges = np.load(os.path.join(directory, "edges.npy"), mmap_mode="r")
+    outdegree = np.load(os.path.join(directory, "outdegree.npy"))
+    n = len(outdegree)
+    dangling = outdegree == 0
+    share = np.divide(1, outdegree, out=np.zeros(n), where=~dangling)
+
+    ranks = np.full(n, 1 / n)
+    for iteration in range(1, max_iterations + 1):
+        spread = ranks * share
+        updated = np.zeros(n)
+        for start in range(0, len(edges), block_size):
+            block = edges[start:start + block_size]
+            updated += np.bincount(
+                block["target"], weights=spread[block["source"]],
+                minlength=n
+            )
+        updated = (damping * updated
+                   + (damping * ranks[dangling].sum() + 1 - damping) / n)
+        change = np.abs(updated - ranks).sum()
+        ranks = updated
+        if change <= tolerance:
+            break
+    return ranks, iteration
+
+
+def main():
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python outofcore.py corpus directory")
+    pages, blocks = crawl_edges(sys.argv[1])
+    write_edges(sys.argv[2], len(pages), blocks)
+    ranks, _ = pagerank(sys.argv[2])
+    print("PageRank Results from Out-of-Core Iteration")
+    for page, rank in zip(pages, ranks.tolist()):
+        print(f"  {page}: {rank:.4f}")
+
+
+if __name__ == "__main__":
+    main()
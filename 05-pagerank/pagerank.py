@@ -68,7 +68,7 @@ def transition_model(corpus, page, damping_factor):
     # list of page link
     links=corpus[page]
     # check if no link for any page
-    if links == {}:
+    if not links:
         # make the problity of each page likly
         for i in pages:
             pages[i]+=(1/len(pages))
@@ -97,21 +97,24 @@ def sample_pagerank(corpus, damping_factor, n):
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
-    start=random.randint(0,len(corpus)-1)
-    pages=list(corpus.keys())
-    page_rank=transition_model(corpus,pages[start],damping_factor)
-    # repeat for n times this conditions
-    for i in range(1,n):
-        prob=list(page_rank.values())
-        rand_c = random.choices(pages,prob)[0]
-        new_page_rank=transition_model(corpus,rand_c,damping_factor)
-        for it in page_rank:
-            page_rank[it]=((i-1)*page_rank[it]+new_page_rank[it])/i
-    
-    return page_rank
-
-        
-
+    # Number the pages, and store each page's links as a tuple of numbers
+    pages = list(corpus)
+    number = {page: i for i, page in enumerate(pages)}
+    links = [tuple(number[link] for link in corpus[page]) for page in pages]
+    visits = [0] * len(pages)
+
+    # Each step follows a random link with probability `damping_factor`,
+    # and otherwise (or from a page with no links) jumps to any page
+    current = random.randrange(len(pages))
+    for _ in range(n):
+        visits[current] += 1
+        outgoing = links[current]
+        if outgoing and random.random() < damping_factor:
+            current = outgoing[random.randrange(len(outgoing))]
+        else:
+            current = random.randrange(len(pages))
+
+    return {page: visits[i] / n for i, page in enumerate(pages)}
 
 
 def iterate_pagerank(corpus, damping_factor):
@@ -0,0 +1,131 @@
+import multiprocessing
+import multiprocessing.shared_memory
+
+import numpy as np
+
+from sparse import DAMPING, MAX_ITERATIONS, TOLERANCE, Graph
+
+
+def partition(graph, processes):
+    """
+    Returns the boundaries of `processes` contiguous blocks of pages,
+    chosen so that each block has about the same number of links into
+    it, which is the work of multiplying its rows of the matrix.
+    """
+    matrix = graph.matrix()
+    work = matrix.indptr + np.arange(graph.n + 1)
+    targets = np.linspace(0, work[-1], processes + 1)
+    bounds = np.searchsorted(work, targets)
+    bounds[0], bounds[-1] = 0, graph.n
+    return np.maximum.accumulate(bounds).tolist()
+
+
+def _worker(rows, dangling, start, end, n, names, processes, index,
+            barrier, sweeps, damping, tolerance, max_iterations):
+    """
+    Runs one process's share of every sweep: multiplies its rows of the
+    matrix by the shared ranks, writes its block of the new ranks, and
+    adds its block's dangling rank and L1 change to the shared totals.
+    """
+    memory = [multiprocessing.shared_memory.SharedMemory(name=name)
+              for name in names]
+    try:
+        ranks = np.ndarray((2, n), dtype=np.float64, buffer=memory[0].buf)
+        totals = np.ndarray((2, 2, processes), dtype=np.float64,
+                            buffer=memory[1].buf)
+
+        # totals[parity] holds each block's (dangling rank, change) for
+        # the ranks in ranks[parity]
+        totals[0, 0, index] = ranks[0, start:end][dangling].sum()
+        barrier.wait()
+        for iteration in range(1, max_iterations + 1):
+            current = ranks[(iteration - 1) % 2]
+            spread = totals[(iteration - 1) % 2, 0].sum()
+            updated = (damping * (rows @ current)
+                       + (damping * spread + 1 - damping) / n)
+            ranks[iteration % 2, start:end] = updated
+            totals[iteration % 2, 0, index] = updated[dangling].sum()
+            totals[iteration % 2, 1, index] = np.abs(
+                updated - current[start:end]
+            ).sum()
+
+            # Nobody writes these totals again until every process has
+            # passed the next barrier, so all of them read the same sum
+            barrier.wait()
+            if totals[iteration % 2, 1].sum() <= tolerance:
+                break
+        if index == 0:
+            sweeps.value = iteration
+        del ranks, totals, current
+    except BaseException:
+        # Release the other processes instead of leaving them waiting
+        barrier.abort()
+        raise
+    finally:
+        for block in memory:
+            block.close()
+
+
+def power_iteration(graph, processes=None, damping=DAMPING,
+                    tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS):
+    """
+    Returns the PageRank vector of a graph by power iteration across
+    `processes` worker processes, one per core by default, as a tuple
+    (ranks, iterations) like `sparse.power_iteration`.
+
+    Pages are split into contiguous blocks, one per process, and each
+    process multiplies only its block's rows of the matrix. The current
+    and next rank vectors live in shared memory, so a sweep is one
+    parallel sparse matrix-vector product followed by a barrier, after
+    which every process reads the same totals and stops together.
+    """
+    processes = processes or multiprocessing.cpu_count()
+    n = graph.n
+    matrix = graph.matrix()
+    bounds = partition(graph, processes)
+
+    rank_memory = multiprocessing.shared_memory.SharedMemory(
+        create=True, size=2 * n * 8
+    )
+    total_memory = multiprocessing.shared_memory.SharedMemory(
+        create=True, size=2 * 2 * processes * 8
+    )
+    try:
+        ranks = np.ndarray((2, n), dtype=np.float64, buffer=rank_memory.buf)
+        ranks[0] = 1 / n
+        names = [rank_memory.name, total_memory.name]
+        barrier = multiprocessing.Barrier(processes)
+        sweeps = multiprocessing.Value("q", 0, lock=False)
+        workers = [
+            multiprocessing.Process(target=_worker, args=(
+                matrix[start:end], graph.dangling[start:end], start, end,
+                n, names, processes, index, barrier, sweeps,
+                damping, tolerance, max_iterations
+            ))
+            for index, (start, end) in enumerate(zip(bounds, bounds[1:]))
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        if any(worker.exitcode for worker in workers):
+            raise RuntimeError("a PageRank worker process failed")
+        iterations = sweeps.value
+        result = ranks[iterations % 2].copy()
+        del ranks
+    finally:
+        for memory in [rank_memory, total_memory]:
+            memory.close()
+            memory.unlink()
+    return result, iterations
+
+
+def iterate_pagerank(corpus, damping_factor, processes=None,
+                     tolerance=TOLERANCE):
+    """
+    Return PageRank values for each page by parallel power iteration,
+    with the same interface as `pagerank.iterate_pagerank`.
+    """
+    graph = Graph.from_corpus(corpus)
+    ranks, _ = power_iteration(graph, processes, damping_factor, tolerance)
+    return graph.ranks(ranks)
@@ -0,0 +1,151 @@
+import collections
+import collections.abc
+import heapq
+import sys
+
+import numpy as np
+
+from pagerank import crawl
+from sparse import DAMPING, Graph, power_iteration
+
+# Largest residual, per link of a page, left unpushed by a query
+EPSILON = 1e-5
+
+
+class PersonalizedPageRank():
+    """
+    Answers personalized PageRank queries over a sparse.Graph by forward
+    push, so that a query only touches pages near its teleport pages.
+
+    The surfer moves as in `pagerank.transition_model`: with probability
+    `damping` it follows a uniformly chosen link, from a page with no
+    links it moves to any page uniformly, and otherwise it jumps back to
+    a page drawn from the query's teleport distribution.
+    """
+
+    def __init__(self, graph, damping=DAMPING, epsilon=EPSILON):
+        self.graph = graph
+        self.damping = damping
+        self.epsilon = epsilon
+        self.pages = graph.pages or range(graph.n)
+        self.number = {page: i for i, page in enumerate(self.pages)}
+
+        # Rank spread uniformly from pages with no links is resolved with
+        # the global PageRank, computed once, and its pages in rank order
+        self.ranks, _ = power_iteration(graph, damping)
+        self.order = np.argsort(-self.ranks, kind="stable").tolist()
+
+    @classmethod
+    def from_corpus(cls, corpus, damping=DAMPING, epsilon=EPSILON):
+        return cls(Graph.from_corpus(corpus), damping, epsilon)
+
+    def teleport(self, pages):
+        """
+        Returns a teleport distribution as a dictionary from page numbers
+        to probabilities, given a page, a collection of pages to choose
+        from uniformly, or a dictionary from pages to weights.
+        """
+        if (isinstance(pages, str)
+                or not isinstance(pages, collections.abc.Iterable)
+                or isinstance(pages, collections.abc.Hashable)
+                and pages in self.number):
+            pages = {pages: 1}
+        elif not isinstance(pages, dict):
+            pages = {page: 1 for page in pages}
+        for page in pages:
+            if page not in self.number:
+                raise ValueError(f"{page} is not in the corpus")
+        total = sum(pages.values())
+        if not pages or total <= 0:
+            raise ValueError("teleport weights must have a positive sum")
+        return {
+            self.number[page]: weight / total
+            for page, weight in pages.items() if weight
+        }
+
+    def push(self, teleport, epsilon=None):
+        """
+        Returns a pair (estimates, uniform) such that the personalized
+        rank of page number i is close to
+
+            estimates.get(i, 0) + uniform * self.ranks[i]
+
+        A page's residual is pushed while it exceeds `epsilon` times its
+        number of links: a 1 - damping share of it is settled on the
+        page, and the rest is spread over its links. Residual pushed from
+        a page with no links is spread over every page, which is the
+        global PageRank scaled by `uniform`.
+        """
+        epsilon = self.epsilon if epsilon is None else epsilon
+        graph = self.graph
+        indptr, indices = graph.indptr, graph.indices
+        estimates = collections.defaultdict(float)
+        residual = collections.defaultdict(float, self.teleport(teleport))
+        spread = 0
+        queue = collections.deque(residual)
+        queued = set(residual)
+        while queue:
+            page = queue.popleft()
+            queued.discard(page)
+            mass = residual.pop(page)
+            estimates[page] += (1 - self.damping) * mass
+            start, end = indptr[page], indptr[page + 1]
+            if start == end:
+                spread += self.damping * mass
+                continue
+            share = self.damping * mass / (end - start)
+            for link in indices[start:end].tolist():
+                residual[link] += share
+                if (link not in queued
+                        and residual[link] > epsilon * max(
+                            1, indptr[link + 1] - indptr[link]
+                        )):
+                    queued.add(link)
+                    queue.append(link)
+        return estimates, spread
+
+    def top(self, teleport, k=10, epsilon=None):
+        """
+        Returns the k pages with the highest personalized rank for a
+        teleport distribution, as a list of (page, rank) pairs.
+        """
+        estimates, uniform = self.push(teleport, epsilon)
+        candidates = [
+            (value + uniform * self.ranks[page], page)
+            for page, value in estimates.items()
+        ]
+
+        # Pages the push never reached only have their share of the
+        # uniform spread, so the best of them come first in global order
+        for page in self.order:
+            if len(candidates) >= len(estimates) + k:
+                break
+            if page not in estimates:
+                candidates.append((uniform * self.ranks[page], page))
+
+        best = heapq.nlargest(k, candidates)
+        return [(self.pages[page], float(rank)) for rank, page in best]
+
+
+def personalized_pagerank(corpus, teleport, damping_factor, k=10):
+    """
+    Return the k pages of a corpus with the highest PageRank for a surfer
+    that jumps to `teleport` pages instead of uniformly chosen pages.
+    """
+    return PersonalizedPageRank.from_corpus(corpus, damping_factor).top(
+        teleport, k
+    )
+
+
+def main():
+    if len(sys.argv) < 3:
+        sys.exit("Usage: python personalized.py corpus page [page ...]")
+    corpus = crawl(sys.argv[1])
+    ranks = personalized_pagerank(corpus, sys.argv[2:], DAMPING)
+    print(f"Personalized PageRank for {', '.join(sys.argv[2:])}")
+    for page, rank in ranks:
+        print(f"  {page}: {rank:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
+
+from sparse import (DAMPING, MAX_ITERATIONS, TOLERANCE, Graph,
+                    power_iteration, step)
+
+# Sweeps between two extrapolations
+EXTRAPOLATE_EVERY = 10
+
+# Sweeps between two rebuilds of the adaptive solver's active rows
+ADAPT_EVERY = 4
+
+
+def residual(graph, ranks, damping=DAMPING):
+    """
+    Returns the L1 norm of the change one PageRank update would make to
+    `ranks`. The L1 error of `ranks` is at most this over 1 - damping.
+    """
+    return np.abs(step(graph, ranks, damping) - ranks).sum()
+
+
+def jacobi(graph, damping=DAMPING, tolerance=TOLERANCE,
+           max_iterations=MAX_ITERATIONS):
+    """
+    Solves by Jacobi iteration, which for PageRank is power iteration:
+    every page is updated from the ranks of the previous sweep.
+    """
+    return power_iteration(graph, damping, tolerance, max_iterations)
+
+
+def gauss_seidel(graph, damping=DAMPING, tolerance=TOLERANCE,
+                 max_iterations=MAX_ITERATIONS):
+    """
+    Solves by Gauss-Seidel iteration, where each page is updated from
+    the ranks already updated in the same sweep.
+
+    Splitting the matrix M into its strictly lower and upper triangles L
+    and U, one sweep solves the triangular system
+
+        (I - damping L) x' = damping U x + c
+
+    where c is the teleport and dangling-page share of every page, which
+    is taken from the ranks x of the previous sweep.
+    """
+    n = graph.n
+    matrix = graph.matrix()
+    lower = (scipy.sparse.identity(n, format="csr")
+             - damping * scipy.sparse.tril(matrix, -1, format="csr"))
+    upper = damping * scipy.sparse.triu(matrix, 1, format="csr")
+    ranks = np.full(n, 1 / n)
+    for iteration in range(1, max_iterations + 1):
+        share = (damping * ranks[graph.dangling].sum() + 1 - damping) / n
+        ranks = scipy.sparse.linalg.spsolve_triangular(
+            lower, upper @ ranks + share, lower=True, unit_diagonal=True
+        )
+        ranks /= ranks.sum()
+        if residual(graph, ranks, damping) <= tolerance:
+            break
+    return ranks, iteration
+
+
+def aitken(history):
+    """
+    Returns Aitken's delta-squared extrapolation of the last three
+    iterates, page by page, keeping the last iterate wherever the
+    differences are too small to extrapolate from.
+    """
+    x0, x1, x2 = history[-3:]
+    first = x2 - x1
+    second = x2 - 2 * x1 + x0
+    safe = np.abs(second) > 1e-15
+    result = x2.copy()
+    result[safe] -= first[safe] ** 2 / second[safe]
+    result = np.maximum(result, 0)
+    return result / result.sum()
+
+
+def quadratic(history):
+    """
+    Returns the quadratic extrapolation of Kamvar et al. from the last
+    four iterates, which removes the components of the error along the
+    second and third eigenvectors.
+    """
+    x0, x1, x2, x3 = history[-4:]
+    y = np.column_stack([x1 - x0, x2 - x0])
+    gamma, *_ = np.linalg.lstsq(y, -(x3 - x0), rcond=None)
+    gamma1, gamma2 = gamma
+    gamma3 = 1
+    result = ((gamma1 + gamma2 + gamma3) * x1
+              + (gamma2 + gamma3) * x2
+              + gamma3 * x3)
+    result = np.maximum(result, 0)
+    return result / result.sum()
+
+
+def extrapolated(extrapolate, needed):
+    """
+    Returns a solver that runs power iteration and, every
+    EXTRAPOLATE_EVERY sweeps, replaces the ranks with an extrapolation
+    of the last `needed` iterates when that lowers the residual.
+    """
+    def solver(graph, damping=DAMPING, tolerance=TOLERANCE,
+               max_iterations=MAX_ITERATIONS):
+        ranks = np.full(graph.n, 1 / graph.n)
+        history = [ranks]
+        for iteration in range(1, max_iterations + 1):
+            updated = step(graph, ranks, damping)
+            change = np.abs(updated - ranks).sum()
+            ranks = updated
+            if change <= tolerance:
+                break
+            history = history[-(needed - 1):] + [ranks]
+            if iteration % EXTRAPOLATE_EVERY == 0 and len(history) == needed:
+                guess = extrapolate(history)
+                if residual(graph, guess, damping) < change:
+                    ranks = guess
+                    history = [ranks]
+        return ranks, iteration
+    return solver
+
+
+def adaptive(graph, damping=DAMPING, tolerance=TOLERANCE,
+             max_iterations=MAX_ITERATIONS):
+    """
+    Solves by the adaptive method of Kamvar et al.: pages whose rank has
+    stopped changing are frozen, and each sweep only multiplies the rows
+    of the pages still active.
+
+    A page is frozen once its change falls below `tolerance` times its
+    rank, so that the frozen pages' changes sum to at most `tolerance`.
+    When no page is active, a full sweep checks the residual, and thaws
+    the pages that would still change too much.
+    """
+    n = graph.n
+    matrix = graph.matrix()
+    ranks = np.full(n, 1 / n)
+    active = np.arange(n)
+    rows = matrix
+    for iteration in range(1, max_iterations + 1):
+        if len(active) == 0:
+            updated = step(graph, ranks, damping)
+            change = np.abs(updated - ranks)
+            ranks = updated
+            if change.sum() <= tolerance:
+                break
+            active = np.flatnonzero(change > tolerance * ranks)
+            rows = matrix[active]
+            continue
+
+        dangling = ranks[graph.dangling].sum()
+        updated = (damping * (rows @ ranks)
+                   + (damping * dangling + 1 - damping) / n)
+        change = np.abs(updated - ranks[active])
+        ranks[active] = updated
+        if iteration % ADAPT_EVERY == 0:
+            active = active[change > tolerance * ranks[active]]
+            rows = matrix[active]
+    return ranks / ranks.sum(), iteration
+
+
+SOLVERS = {
+    "jacobi": jacobi,
+    "gauss_seidel": gauss_seidel,
+    "aitken": extrapolated(aitken, 3),
+    "quadratic": extrapolated(quadratic, 4),
+    "adaptive": adaptive,
+}
+
+
+def solve(graph, method="jacobi", damping=DAMPING, tolerance=TOLERANCE,
+          max_iterations=MAX_ITERATIONS):
+    """
+    Returns a tuple (ranks, iterations) for a sparse.Graph using the
+    solver named `method`, one of SOLVERS.
+    """
+    if method not in SOLVERS:
+        raise ValueError(f"unknown solver {method}")
+    return SOLVERS[method](graph, damping, tolerance, max_iterations)
+
+
+def iterate_pagerank(corpus, damping_factor, method="jacobi",
+                     tolerance=TOLERANCE):
+    """
+    Return PageRank values for each page using the solver named
+    `method`, with the same interface as `pagerank.iterate_pagerank`.
+    """
+    graph = Graph.from_corpus(corpus)
+    ranks, _ = solve(graph, method, damping_factor, tolerance)
+    return graph.ranks(ranks)
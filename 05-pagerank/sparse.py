@@ -0,0 +1,122 @@
+import numpy as np
+import scipy.sparse
+
+DAMPING = 0.85
+TOLERANCE = 1e-8
+MAX_ITERATIONS = 1000
+
+
+class Graph():
+    """
+    Compact link graph of a corpus, with pages numbered 0 to n - 1 and
+    out-links stored in compressed sparse row (CSR) form: the pages
+    linked to by page i are indices[indptr[i]:indptr[i + 1]].
+    """
+
+    def __init__(self, indptr, indices, pages=None):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.n = len(self.indptr) - 1
+        self.pages = pages
+        self.outdegree = np.diff(self.indptr)
+        self.dangling = self.outdegree == 0
+        self._matrix = None
+
+    @classmethod
+    def from_edges(cls, n, sources, targets, pages=None):
+        """
+        Builds a graph over n pages from parallel arrays of link sources
+        and targets, dropping self-links and repeated links.
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        keep = sources != targets
+        edges = np.sort(sources[keep] * n + targets[keep])
+        if len(edges):
+            edges = edges[np.concatenate(([True], edges[1:] != edges[:-1]))]
+        sources, targets = np.divmod(edges, n)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=n), out=indptr[1:])
+        return cls(indptr, targets, pages)
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """
+        Builds a graph from a dictionary mapping each page to the set
+        of pages it links to, as returned by `crawl`.
+        """
+        pages = sorted(corpus)
+        number = {page: i for i, page in enumerate(pages)}
+        sources = []
+        targets = []
+        for page in pages:
+            for link in corpus[page]:
+                sources.append(number[page])
+                targets.append(number[link])
+        return cls.from_edges(len(pages), sources, targets, pages)
+
+    def matrix(self):
+        """
+        Returns the sparse n x n matrix M with M[j, i] = 1 / outdegree(i)
+        for every link from page i to page j, so that M @ ranks spreads
+        each page's rank evenly over its links. Built once, then cached.
+        """
+        if self._matrix is None:
+            sources = np.repeat(np.arange(self.n), self.outdegree)
+            weights = 1 / self.outdegree[sources]
+            self._matrix = scipy.sparse.csr_matrix(
+                (weights, (self.indices, sources)), shape=(self.n, self.n)
+            )
+        return self._matrix
+
+    def ranks(self, vector):
+        """
+        Returns a dictionary mapping page names to values of `vector`.
+        """
+        pages = self.pages if self.pages is not None else range(self.n)
+        return dict(zip(pages, vector.tolist()))
+
+
+def step(graph, ranks, damping):
+    """
+    Returns the ranks after one application of the PageRank update.
+
+    A page with no links is treated as linking to every page, including
+    itself. Rather than adding those links to the matrix, their total
+    rank is spread evenly over all pages, which is a rank-1 correction.
+    """
+    dangling = ranks[graph.dangling].sum()
+    return (damping * (graph.matrix() @ ranks)
+            + (damping * dangling + 1 - damping) / graph.n)
+
+
+def power_iteration(graph, damping=DAMPING, tolerance=TOLERANCE,
+                    max_iterations=MAX_ITERATIONS, start=None):
+    """
+    Returns the PageRank vector of a graph by power iteration, starting
+    from the ranks `start` (uniform by default) and stopping once the L1
+    change between two sweeps is at most `tolerance`.
+
+    Returns a tuple (ranks, iterations).
+    """
+    if start is None:
+        ranks = np.full(graph.n, 1 / graph.n)
+    else:
+        ranks = np.asarray(start, dtype=float)
+    for iteration in range(1, max_iterations + 1):
+        updated = step(graph, ranks, damping)
+        change = np.abs(updated - ranks).sum()
+        ranks = updated
+        if change <= tolerance:
+            break
+    return ranks, iteration
+
+
+def iterate_pagerank(corpus, damping_factor, tolerance=TOLERANCE):
+    """
+    Return PageRank values for each page by sparse power iteration,
+    with the same interface as `pagerank.iterate_pagerank`.
+    """
+    graph = Graph.from_corpus(corpus)
+    ranks, _ = power_iteration(graph, damping_factor, tolerance)
+    return graph.ranks(ranks)
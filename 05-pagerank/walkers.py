@@ -0,0 +1,120 @@
+import multiprocessing
+
+import numpy as np
+
+from sparse import DAMPING, Graph
+
+# Steps discarded at the start of every walk, so that walkers started
+# uniformly forget their starting page; the remaining bias is about
+# DAMPING ** BURN_IN
+BURN_IN = 50
+
+# Steps recorded between two visit counts, as a (BLOCK, walkers) buffer
+BLOCK = 64
+
+# Graph shared with the worker processes of `monte_carlo`
+_graph = None
+
+
+def walk(graph, walkers, steps, damping=DAMPING, seed=None,
+         burn_in=BURN_IN):
+    """
+    Advances `walkers` independent random surfers together for `steps`
+    steps each over a sparse.Graph, and returns an integer array with
+    the number of visits to each page.
+
+    Every surfer follows a uniformly chosen link with probability
+    `damping`, and otherwise (or from a page with no links) jumps to a
+    uniformly chosen page, as in `pagerank.transition_model`. All the
+    surfers move in one NumPy operation per step.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Walk on 32-bit page numbers when they fit, to halve memory traffic
+    kind = np.int32 if len(graph.indices) < 2 ** 31 else np.int64
+    indptr = graph.indptr.astype(kind)
+    indices = graph.indices.astype(kind)
+    outdegree = graph.outdegree.astype(kind)
+    last = max(0, len(indices) - 1)
+    if not len(indices):
+        indices = np.zeros(1, dtype=kind)
+
+    current = rng.integers(0, graph.n, walkers, dtype=kind)
+    visits = np.zeros(graph.n, dtype=np.int64)
+    buffer = np.empty((BLOCK, walkers), dtype=kind)
+    filled = 0
+    for step in range(burn_in + steps):
+        # One uniform draw per surfer picks both whether to follow a
+        # link and, rescaled, which link to follow. Every surfer looks up
+        # a link, even those that jump, so that no step needs a mask.
+        draws = rng.random(walkers)
+        degree = outdegree[current]
+        offsets = (draws * (1 / damping) * degree).astype(kind)
+        links = indices[np.minimum(indptr[current] + offsets, last)]
+        follow = (draws < damping) & (degree > 0)
+        jumps = rng.integers(0, graph.n, walkers, dtype=kind)
+        current = np.where(follow, links, jumps)
+
+        if step < burn_in:
+            continue
+        buffer[filled] = current
+        filled += 1
+        if filled == BLOCK:
+            visits += np.bincount(buffer.ravel(), minlength=graph.n)
+            filled = 0
+    visits += np.bincount(buffer[:filled].ravel(), minlength=graph.n)
+    return visits
+
+
+def _initialize(graph):
+    global _graph
+    _graph = graph
+
+
+def _walk(args):
+    return walk(_graph, *args)
+
+
+def monte_carlo(graph, walkers=10000, steps=1000, damping=DAMPING,
+                seed=0, processes=1):
+    """
+    Returns the PageRank vector of a sparse.Graph estimated from the
+    visit counts of `walkers` surfers taking `steps` steps each.
+
+    With `processes` greater than 1 the walkers are split into that
+    many shards, each walked by its own process with an independent
+    random stream derived from `seed`, so that a given seed and number
+    of processes always gives the same result.
+
+    The estimate is the average of walkers * steps visits. Its L1 error
+    against the exact ranks falls roughly as sqrt(n / (walkers * steps))
+    for a graph of n pages; with 100 samples per page it is typically
+    below 0.1.
+    """
+    streams = np.random.SeedSequence(seed).spawn(processes)
+    if processes == 1:
+        visits = walk(graph, walkers, steps, damping, streams[0])
+    else:
+        shards = [
+            (len(shard), steps, damping, stream)
+            for shard, stream in zip(
+                np.array_split(np.arange(walkers), processes), streams
+            )
+        ]
+        with multiprocessing.Pool(
+            processes, initializer=_initialize, initargs=(graph,)
+        ) as pool:
+            visits = sum(pool.map(_walk, shards))
+    return visits / visits.sum()
+
+
+def walk_pagerank(corpus, damping_factor, n, walkers=1000, seed=None):
+    """
+    Return PageRank values for each page estimated from about `n`
+    samples taken by `walkers` surfers at once, with the same interface
+    as `pagerank.sample_pagerank`.
+    """
+    graph = Graph.from_corpus(corpus)
+    steps = max(1, n // walkers)
+    visits = walk(graph, walkers, steps, damping_factor, seed)
+    return graph.ranks(visits / visits.sum())